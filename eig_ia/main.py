@@ -1,26 +1,37 @@
 import argparse
+import contextlib
+import copy
+import json
+import multiprocessing
 import os
-from typing import Any, Dict, List
+from itertools import islice
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
 
 import yaml
 
-from src.data.art_loader import load_art
-from src.data.ambigqa_loader import load_ambigqa
+from src.data.art_loader import iter_art, load_art
+from src.data.ambigqa_loader import iter_ambigqa, load_ambigqa
+from src.data.processed_cache import processed_path, save_processed
 from src.eig.posterior import entropy, max_prob
 from src.eval.calibration import compute_ece
 from src.eval.metrics import compute_metrics, f1_score, normalize_text
 from src.eval.stats import paired_bootstrap
 from src.eval.human_eval_prep import make_human_eval_csv
 from src.llm.api_llm import APILLM
+from src.llm.cached_llm import CachedLLM
 from src.llm.hf_llm import HFLLM
+from src.llm.lazy_llm import LazyLLM
+from src.llm.model_pool import loaded_models
 from src.methods.direct import run_direct
 from src.methods.random_question import run_random_question
 from src.methods.generic_clarify import run_generic_clarify
 from src.methods.eig_ia import run_eig_ia
 from src.methods.dpo_question_ranker import run_dpo_question_ranker
-from src.utils.io import write_csv, write_jsonl, read_jsonl
+from src.methods.shared_stages import SharedStages
+from src.utils.caching import SQLiteCache
+from src.utils.io import append_jsonl, read_jsonl, read_jsonl_checkpoint, write_csv, write_jsonl
 from src.utils.logging import get_run_dir, save_json
-from src.utils.seeds import set_seeds
+from src.utils.seeds import derive_seed, get_rng, set_seeds
 
 
 METHODS = {
@@ -51,27 +62,78 @@ def load_config(path: str) -> Dict[str, Any]:
     return cfg
 
 
-def build_llm(cfg: Dict[str, Any]):
-    if cfg["type"] == "api":
-        return APILLM(cfg["name_or_path"], cfg.get("decoding", {}))
-    return HFLLM(cfg["name_or_path"], cfg.get("decoding", {}))
+def parse_shard(value: str) -> Tuple[int, int]:
+    index, total = (int(part) for part in value.split("/"))
+    if total < 1 or not 0 <= index < total:
+        raise ValueError(f"Invalid shard {value!r}; expected i/n with 0 <= i < n")
+    return index, total
+
+
+# Role config fields that only affect throughput or retries, never the outputs, stay out of cache keys.
+_NON_SEMANTIC_MODEL_KEYS = {"max_concurrency", "requests_per_second", "max_retries", "timeout", "prefix_cache_mb"}
+
+
+def build_llm(cfg: Dict[str, Any], cache_cfg: Optional[Dict[str, Any]] = None, seed: int = 0):
+    llm = _build_backend(cfg)
+    if cache_cfg and cache_cfg.get("enabled", False):
+        cache = SQLiteCache(cache_cfg.get("path", "cache/llm_cache.sqlite"), int(float(cache_cfg.get("max_mb", 1024)) * 1024 * 1024))
+        backend = {k: v for k, v in cfg.items() if k not in _NON_SEMANTIC_MODEL_KEYS}
+        llm = CachedLLM(llm, cache, seed, bool(cache_cfg.get("cache_sampled", False)), backend)
+    return llm
+
 
+def build_lazy_llm(cfg: Dict[str, Any], cache_cfg: Optional[Dict[str, Any]] = None, seed: int = 0) -> LazyLLM:
+    return LazyLLM(lambda: build_llm(cfg, cache_cfg, seed), cfg["name_or_path"], cfg.get("decoding", {}))
 
-def get_dataset(cfg: Dict[str, Any]) -> List[Dict[str, Any]]:
+
+def _build_backend(cfg: Dict[str, Any]):
+    if cfg["type"] == "api":
+        return APILLM(
+            cfg["name_or_path"],
+            cfg.get("decoding", {}),
+            int(cfg.get("max_concurrency", 8)),
+            cfg.get("api_base"),
+            float(cfg.get("requests_per_second", 0.0)),
+            int(cfg.get("max_retries", 5)),
+            float(cfg.get("timeout", 60.0)),
+        )
+    return HFLLM(
+        cfg["name_or_path"],
+        cfg.get("decoding", {}),
+        int(cfg.get("score_batch_size", 16)),
+        float(cfg.get("prefix_cache_mb", 0.0)),
+        str(cfg.get("dtype", "float32")),
+    )
+
+
+def iter_dataset(cfg: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """Lazily yield at most dataset.max_examples examples; reading stops once enough are collected.
+
+    Capped runs stream from the Hub; full-split runs go through the local datasets cache instead.
+    Callers running several methods on one capped split should read it once (see _stream_methods).
+    """
     name = cfg["dataset"]["name"]
     split = cfg["dataset"].get("split", "dev")
     max_examples = int(cfg["dataset"].get("max_examples", 0))
-    if name == "art":
-        return load_art(split, max_examples)
-    return load_ambigqa(split, max_examples)
+    processed_dir = cfg["dataset"].get("processed_dir", "data/processed")
+    loader = iter_art if name == "art" else iter_ambigqa
+    examples = loader(split, processed_dir, streaming=max_examples > 0)
+    return islice(examples, max_examples or None)
 
 
 def download_data(cfg: Dict[str, Any]) -> None:
-    _ = get_dataset(cfg)
+    """Fill the local datasets cache for the configured split and write its processed Arrow file."""
+    preprocess(cfg)
 
 
-def preprocess(cfg: Dict[str, Any]) -> None:
-    _ = get_dataset(cfg)
+def preprocess(cfg: Dict[str, Any]) -> str:
+    """Parse the full split once from the Hub and store it as a versioned, memory-mappable Arrow file."""
+    name = cfg["dataset"]["name"]
+    split = cfg["dataset"].get("split", "dev")
+    loader = load_art if name == "art" else load_ambigqa
+    examples = loader(split, 0)
+    path = processed_path(cfg["dataset"].get("processed_dir", "data/processed"), name, split)
+    return save_processed(examples, path)
 
 
 def _aggregate_usage(meta: Dict[str, Any]) -> Dict[str, int]:
@@ -153,119 +215,344 @@ def _em_f1(pred_answer: str, gold_answers: List[str]) -> Dict[str, float]:
     return {"em": em, "f1": f1}
 
 
-def run_method(cfg: Dict[str, Any], method: str) -> List[Dict[str, Any]]:
-    data = get_dataset(cfg)
-    mode = cfg.get("mode", "oracle")
-    llm_q = build_llm(cfg["models"]["question_model"])
-    llm_a = build_llm(cfg["models"]["answer_model"])
-    llm_scorer = build_llm(cfg["models"]["scorer_model"])
+def _build_role_llms(cfg: Dict[str, Any]) -> Dict[str, LazyLLM]:
+    seed = int(cfg["evaluation"]["seed"])
+    return {
+        "question": build_lazy_llm(cfg["models"]["question_model"], cfg.get("cache"), seed),
+        "answer": build_lazy_llm(cfg["models"]["answer_model"], cfg.get("cache"), seed),
+        "scorer": build_lazy_llm(cfg["models"]["scorer_model"], cfg.get("cache"), seed),
+    }
 
-    rows = []
-    for idx, ex in enumerate(data):
-        example_id = ex.get("id") or str(idx)
-        if cfg["dataset"]["name"] == "art":
-            gold = int(ex["label"]) - 1
-            observation = ex["observation"]
-            hypotheses = ex["hypotheses"]
-            answer_sets = []
-        else:
-            gold = 0
-            observation = ex["question"]
-            hypotheses = ex["rewrites"]
-            answer_sets = ex.get("answer_sets", [])
-
-        if method == "direct":
-            result = METHODS[method](cfg["dataset"]["name"], ex, llm_scorer)
-        elif method in {"random_question"}:
-            result = METHODS[method](cfg["dataset"]["name"], ex, llm_q, llm_a, llm_scorer, mode, int(cfg["eig"]["K_questions"]))
-        elif method in {"generic_clarify"}:
-            result = METHODS[method](cfg["dataset"]["name"], ex, llm_q, llm_a, llm_scorer, mode)
-        else:
-            result = METHODS[method](
-                cfg["dataset"]["name"],
-                ex,
-                llm_q,
-                llm_a,
-                llm_scorer,
-                mode,
-                int(cfg["eig"]["K_questions"]),
-                int(cfg["eig"]["M_answers"]),
-                cfg["eig"]["estimator"],
-                bool(cfg["gating"]["enabled"]),
-                float(cfg["gating"]["tau"]),
-                float(cfg["gating"]["gamma"]),
-            )
 
-        prior_probs = result.get("prior_probs") or []
-        posterior_probs = result.get("posterior_probs") or []
-        prior_entropy = entropy(prior_probs) if prior_probs else 0.0
-        posterior_entropy = entropy(posterior_probs) if posterior_probs else 0.0
-        delta_entropy = prior_entropy - posterior_entropy
-        confidence = max_prob(posterior_probs) if posterior_probs else 0.0
-        correct = 1 if int(result["pred"]) == int(gold) else 0
-
-        usage = _aggregate_usage(result.get("meta", {}))
-        latency_total = _aggregate_latency(result.get("meta", {}))
-        usage_by_module = _usage_by_module(result.get("meta", {}))
-        latency_by_module = _latency_by_module(result.get("meta", {}))
-        prompts = _extract_prompts(result.get("meta", {})) if cfg["logging"].get("save_prompts", False) else {}
-
-        pred_answer = ""
-        em_f1 = {"em": 0.0, "f1": 0.0}
-        if cfg["dataset"]["name"] != "art":
-            pred_idx = int(result["pred"])
-            pred_idx = max(0, min(pred_idx, len(hypotheses) - 1))
-            ans_set_pred = answer_sets[pred_idx] if pred_idx < len(answer_sets) else []
-            gold_answers = answer_sets[0] if answer_sets else []
-            pred_answer = _answer_ambigqa(llm_a, hypotheses[pred_idx], mode, ans_set_pred)
-            em_f1 = _em_f1(pred_answer, gold_answers)
-
-        row = {
-            "example_id": example_id,
-            "dataset": cfg["dataset"]["name"],
-            "method": method,
-            "asked": result.get("asked", False),
-            "q": result.get("question", ""),
-            "a": result.get("answer", ""),
-            "prior_probs": prior_probs,
-            "posterior_probs": posterior_probs,
-            "prior_entropy": prior_entropy,
-            "posterior_entropy": posterior_entropy,
-            "delta_entropy": delta_entropy,
-            "eig_estimate": result.get("eig", 0.0),
-            "pred": result["pred"],
-            "gold": gold,
-            "confidence": confidence,
-            "accuracy": correct,
-            "tokens_in": usage["tokens_in"],
-            "tokens_out": usage["tokens_out"],
-            "tokens_total": usage["tokens_total"],
-            "latency_total": latency_total,
-            "latency_per_module": latency_by_module,
-            "tokens_per_module": usage_by_module,
-            "final_answer": pred_answer,
-            "em": em_f1["em"],
-            "f1": em_f1["f1"],
-            "prompts": prompts,
-            "model_ids": {
-                "question": cfg["models"]["question_model"]["name_or_path"],
-                "answer": cfg["models"]["answer_model"]["name_or_path"],
-                "scorer": cfg["models"]["scorer_model"]["name_or_path"],
-            },
-            "decoding_params": {
-                "question": cfg["models"]["question_model"].get("decoding", {}),
-                "answer": cfg["models"]["answer_model"].get("decoding", {}),
-                "scorer": cfg["models"]["scorer_model"].get("decoding", {}),
-            },
-            "seed": cfg["evaluation"]["seed"],
-            "observation": observation,
-            "hypotheses": hypotheses,
-        }
+def _run_example(
+    cfg: Dict[str, Any],
+    method: str,
+    llms: Dict[str, LazyLLM],
+    idx: int,
+    ex: Dict[str, Any],
+    shared: Optional[SharedStages] = None,
+) -> Dict[str, Any]:
+    mode = cfg.get("mode", "oracle")
+    llm_q, llm_a, llm_scorer = llms["question"], llms["answer"], llms["scorer"]
+    example_id = ex.get("id") or str(idx)
+    # Per-example streams derived from (seed, method, example_id) keep results independent of
+    # example order, sharding and worker count.
+    example_seed = derive_seed(cfg["evaluation"]["seed"], method, example_id)
+    rng = get_rng(example_seed)
+    for role, llm in llms.items():
+        llm.reseed(derive_seed(example_seed, role))
+    if cfg["dataset"]["name"] == "art":
+        gold = int(ex["label"]) - 1
+        observation = ex["observation"]
+        hypotheses = ex["hypotheses"]
+        answer_sets = []
+    else:
+        gold = 0
+        observation = ex["question"]
+        hypotheses = ex["rewrites"]
+        answer_sets = ex.get("answer_sets", [])
+
+    adaptive = cfg["eig"].get("adaptive") or {}
+    if method == "direct":
+        result = METHODS[method](cfg["dataset"]["name"], ex, llm_scorer, shared=shared)
+    elif method in {"random_question"}:
+        result = METHODS[method](cfg["dataset"]["name"], ex, llm_q, llm_a, llm_scorer, mode, int(cfg["eig"]["K_questions"]), rng, shared=shared)
+    elif method in {"generic_clarify"}:
+        result = METHODS[method](cfg["dataset"]["name"], ex, llm_q, llm_a, llm_scorer, mode, shared=shared)
+    else:
+        result = METHODS[method](
+            cfg["dataset"]["name"],
+            ex,
+            llm_q,
+            llm_a,
+            llm_scorer,
+            mode,
+            int(cfg["eig"]["K_questions"]),
+            int(cfg["eig"]["M_answers"]),
+            cfg["eig"]["estimator"],
+            bool(cfg["gating"]["enabled"]),
+            float(cfg["gating"]["tau"]),
+            float(cfg["gating"]["gamma"]),
+            answer_dist=cfg["eig"].get("answer_dist", "sample"),
+            shared=shared,
+            prune=bool(cfg["gating"].get("prune", True)),
+            selection=cfg["eig"].get("selection", "exhaustive"),
+            adaptive=adaptive if adaptive.get("enabled", False) else None,
+            answer_clustering=cfg["eig"].get("answer_clustering"),
+            question_dedup=cfg["eig"].get("question_dedup"),
+            hypothesis_pruning=cfg["eig"].get("hypothesis_pruning"),
+            deadline=cfg["eig"].get("deadline"),
+        )
+
+    prior_probs = result.get("prior_probs") or []
+    posterior_probs = result.get("posterior_probs") or []
+    kept = result.get("kept_hypotheses")
+    metric_prior = prior_probs
+    if result.get("asked") and kept and len(kept) < len(prior_probs):
+        # The posterior only covers the pruned hypothesis set, so compare it with the prior on that set.
+        kept_mass = sum(prior_probs[i] for i in kept)
+        metric_prior = [p / kept_mass if i in kept else 0.0 for i, p in enumerate(prior_probs)]
+    prior_entropy = entropy(metric_prior) if metric_prior else 0.0
+    posterior_entropy = entropy(posterior_probs) if posterior_probs else 0.0
+    delta_entropy = prior_entropy - posterior_entropy
+    confidence = max_prob(posterior_probs) if posterior_probs else 0.0
+    correct = 1 if int(result["pred"]) == int(gold) else 0
+
+    usage = _aggregate_usage(result.get("meta", {}))
+    latency_total = _aggregate_latency(result.get("meta", {}))
+    usage_by_module = _usage_by_module(result.get("meta", {}))
+    latency_by_module = _latency_by_module(result.get("meta", {}))
+    prompts = _extract_prompts(result.get("meta", {})) if cfg["logging"].get("save_prompts", False) else {}
+
+    pred_answer = ""
+    em_f1 = {"em": 0.0, "f1": 0.0}
+    if cfg["dataset"]["name"] != "art":
+        pred_idx = int(result["pred"])
+        pred_idx = max(0, min(pred_idx, len(hypotheses) - 1))
+        ans_set_pred = answer_sets[pred_idx] if pred_idx < len(answer_sets) else []
+        gold_answers = answer_sets[0] if answer_sets else []
+        # Own stream for the final answer, so it does not depend on how much sampling the method did.
+        llm_a.reseed(derive_seed(example_seed, "final_answer"))
+        pred_answer = _answer_ambigqa(llm_a, hypotheses[pred_idx], mode, ans_set_pred)
+        em_f1 = _em_f1(pred_answer, gold_answers)
+
+    row = {
+        "example_id": example_id,
+        "example_idx": idx,
+        "dataset": cfg["dataset"]["name"],
+        "method": method,
+        "asked": result.get("asked", False),
+        "gate_pruned": result.get("pruned", False),
+        "hypotheses_kept": result.get("hypotheses_kept", len(hypotheses)),
+        "pruned_prior_mass": result.get("pruned_prior_mass", 0.0),
+        "deadline_hit": result.get("deadline_hit", False),
+        "work_completed": result.get("work_completed", {}),
+        "q": result.get("question", ""),
+        "a": result.get("answer", ""),
+        "prior_probs": prior_probs,
+        "posterior_probs": posterior_probs,
+        "prior_entropy": prior_entropy,
+        "posterior_entropy": posterior_entropy,
+        "delta_entropy": delta_entropy,
+        "eig_estimate": result.get("eig", 0.0),
+        "eig_bound": result.get("eig_bound"),
+        "pred": result["pred"],
+        "gold": gold,
+        "confidence": confidence,
+        "accuracy": correct,
+        "tokens_in": usage["tokens_in"],
+        "tokens_out": usage["tokens_out"],
+        "tokens_total": usage["tokens_total"],
+        "latency_total": latency_total,
+        "latency_per_module": latency_by_module,
+        "tokens_per_module": usage_by_module,
+        "final_answer": pred_answer,
+        "em": em_f1["em"],
+        "f1": em_f1["f1"],
+        "prompts": prompts,
+        "model_ids": {
+            "question": cfg["models"]["question_model"]["name_or_path"],
+            "answer": cfg["models"]["answer_model"]["name_or_path"],
+            "scorer": cfg["models"]["scorer_model"]["name_or_path"],
+        },
+        "decoding_params": {
+            "question": cfg["models"]["question_model"].get("decoding", {}),
+            "answer": cfg["models"]["answer_model"].get("decoding", {}),
+            "scorer": cfg["models"]["scorer_model"].get("decoding", {}),
+        },
+        "seed": cfg["evaluation"]["seed"],
+        "example_seed": example_seed,
+        "observation": observation,
+        "hypotheses": hypotheses,
+    }
+    return row
+
+
+_WORKER: Dict[str, Any] = {}
+
+
+def _init_worker(runs: List[Tuple[str, str, Dict[str, Any]]], workers: int) -> None:
+    # Split the node's cores across workers so intra-op threads do not oversubscribe.
+    import torch
+
+    torch.set_num_threads(max(1, (os.cpu_count() or 1) // workers))
+    set_seeds(int(runs[0][2]["evaluation"]["seed"]))
+    _WORKER.update({"runs": runs, "llms": {}, "shared": SharedStages()})
+
+
+def _run_example_in_worker(
+    task: Tuple[int, int, Dict[str, Any], Dict[Tuple, Any]]
+) -> Tuple[Dict[str, Any], Dict[Tuple, Any], int, Dict[str, Any]]:
+    # A task is (run index, example index, example, the parent's shared entries for that example).
+    # Newly computed shared stages travel back with the row, together with a snapshot of this
+    # worker's cumulative model and cache stats for the run.
+    run_index, idx, ex, entries = task
+    _, method, cfg = _WORKER["runs"][run_index]
+    if run_index not in _WORKER["llms"]:
+        # Runs arrive one after another; drop the finished run's handles (the weights stay pooled).
+        _WORKER["llms"] = {run_index: _build_role_llms(cfg)}
+    llms = _WORKER["llms"][run_index]
+    shared = _WORKER["shared"]
+    shared.update(entries)
+    hits = shared.hits
+    row = _run_example(cfg, method, llms, idx, ex, shared)
+    report = {
+        "pid": os.getpid(),
+        "roles": {role: llm.stats() for role, llm in llms.items()},
+        "materialized_roles": [role for role, llm in llms.items() if llm.materialized],
+        "model_pool": loaded_models(),
+    }
+    return row, shared.drain_new(), shared.hits - hits, report
+
+
+def _worker_pool(runs: List[Tuple[str, str, Dict[str, Any]]], workers: int):
+    # Spawned once per invocation: each worker imports torch and loads each checkpoint once for all runs.
+    return multiprocessing.get_context("spawn").Pool(workers, initializer=_init_worker, initargs=(runs, workers))
+
+
+def _example_stage_key(dataset: str, ex: Dict[str, Any]) -> Tuple[str, str, List[str]]:
+    if dataset == "art":
+        return dataset, ex["observation"], ex["hypotheses"]
+    return dataset, ex["question"], ex["rewrites"]
+
+
+def _union_pools(pools: List[List[Dict[str, str]]]) -> List[Dict[str, str]]:
+    merged: List[Dict[str, str]] = []
+    for pool in pools:
+        merged.extend(m for m in pool if m not in merged)
+    return merged
+
+
+_COUNTERS = {"hits", "misses", "evictions", "tokens_reused", "tokens_computed", "requests", "retries"}
+
+
+def _merge_stats(parts: List[Dict[str, Any]], per_process: bool = False) -> Dict[str, Any]:
+    """Combine stats dicts from several workers: counters are summed and hit rates recomputed.
+
+    Other numbers describe a resource; per_process ones (each worker's prefix cache) are summed too,
+    shared ones (the SQLite cache file) are taken from the last worker.
+    """
+    merged: Dict[str, Any] = {}
+    for part in parts:
+        for key, value in part.items():
+            if isinstance(value, dict):
+                merged[key] = _merge_stats([p[key] for p in parts if isinstance(p.get(key), dict)], per_process or key == "prefix_cache")
+            elif isinstance(value, (int, float)) and (key in _COUNTERS or per_process) and key != "hit_rate":
+                merged[key] = merged.get(key, 0) + value
+            else:
+                merged[key] = value
+    if "hits" in merged and "misses" in merged:
+        lookups = merged["hits"] + merged["misses"]
+        merged["hit_rate"] = merged["hits"] / lookups if lookups else 0.0
+    return merged
+
+
+def run_method(
+    cfg: Dict[str, Any],
+    method: str,
+    stats: Optional[Dict[str, Any]] = None,
+    workers: int = 1,
+    on_row: Optional[Callable[[Dict[str, Any]], None]] = None,
+    skip_ids: Optional[Set[str]] = None,
+    shared: Optional[SharedStages] = None,
+    pool: Optional[Any] = None,
+    run_index: int = 0,
+    examples: Optional[List[Dict[str, Any]]] = None,
+) -> List[Dict[str, Any]]:
+    """Run one method over `examples` (default: the configured split); with workers > 1, on `pool`
+    (whose runs[run_index] must be this method and cfg), or on a pool created for this call."""
+    if workers > 1 and pool is None:
+        with _worker_pool([(method, method, cfg)], workers) as own_pool:
+            return run_method(cfg, method, stats, workers, on_row, skip_ids, shared, own_pool, 0, examples)
+    shared = shared if shared is not None else SharedStages()
+    shard_index, num_shards = cfg["dataset"].get("shard") or (0, 1)
+    items = (
+        (idx, ex)
+        for idx, ex in enumerate(examples if examples is not None else iter_dataset(cfg))
+        if idx % num_shards == shard_index and (not skip_ids or (ex.get("id") or str(idx)) not in skip_ids)
+    )
+    rows = []
+    if pool is not None:
+        # imap keeps rows in dataset order; each task carries the stages other workers already computed.
+        dataset = cfg["dataset"]["name"]
+        tasks = ((run_index, idx, ex, shared.example_entries(*_example_stage_key(dataset, ex))) for idx, ex in items)
+        reports: Dict[int, Dict[str, Any]] = {}
+        for row, new_entries, hits, report in pool.imap(_run_example_in_worker, tasks, chunksize=1):
+            shared.hits += hits
+            shared.misses += len(new_entries)
+            shared.update(new_entries)
+            reports[report["pid"]] = report
+            if on_row is not None:
+                on_row(row)
+            rows.append(row)
+        if stats is not None:
+            stats["workers"] = workers
+            stats.update(_merge_stats([r["roles"] for r in reports.values()]))
+            stats["materialized_roles"] = sorted({role for r in reports.values() for role in r["materialized_roles"]})
+            stats["model_pool"] = _union_pools([r["model_pool"] for r in reports.values()])
+            stats["gate_pruned"] = sum(1 for r in rows if r["gate_pruned"])
+        return rows
+
+    llms = _build_role_llms(cfg)
+    for idx, ex in items:
+        row = _run_example(cfg, method, llms, idx, ex, shared)
+        if on_row is not None:
+            on_row(row)
         rows.append(row)
-
+    if stats is not None:
+        stats.update({role: llm.stats() for role, llm in llms.items()})
+        stats["materialized_roles"] = [role for role, llm in llms.items() if llm.materialized]
+        stats["gate_pruned"] = sum(1 for r in rows if r["gate_pruned"])
     return rows
 
 
+def _stream_methods(
+    cfg: Dict[str, Any],
+    runs: List[Tuple[str, str, Dict[str, Any]]],
+    run_dir: str,
+    stats: Dict[str, Any],
+    workers: int,
+    resume: bool,
+    append: bool,
+) -> List[Dict[str, Any]]:
+    """Run (stats_key, method, cfg) entries, appending each row to per_example.jsonl as it finishes.
+
+    With resume, (dataset, method, example_id) triples already in the file are skipped; with
+    append the file is kept; otherwise it starts empty. All entries share one SharedStages memo, so
+    the prior (and ART template questions) of each example is computed once for every method. With
+    workers > 1 one process pool serves every entry. A capped split is read once and reused by every
+    entry on it. Returns every row in the file afterwards.
+    """
+    path = os.path.join(run_dir, "per_example.jsonl")
+    existing = read_jsonl_checkpoint(path) if resume or append else []
+    if not (resume or append):
+        write_jsonl(path, [])
+    done: Dict[Tuple[str, str], Set[str]] = {}
+    if resume:
+        for r in existing:
+            done.setdefault((r["dataset"], r["method"]), set()).add(str(r["example_id"]))
+    shared = SharedStages()
+    on_row = lambda row: append_jsonl(path, [row])  # noqa: E731
+    capped: Dict[Tuple[Any, ...], List[Dict[str, Any]]] = {}
+    with contextlib.ExitStack() as stack:
+        pool = stack.enter_context(_worker_pool(runs, workers)) if workers > 1 else None
+        for run_index, (key, method, run_cfg) in enumerate(runs):
+            skip_ids = done.get((run_cfg["dataset"]["name"], method), set())
+            examples = None
+            if int(run_cfg["dataset"].get("max_examples", 0)) > 0:
+                data_key = tuple(run_cfg["dataset"].get(k) for k in ("name", "split", "max_examples", "processed_dir"))
+                if data_key not in capped:
+                    capped[data_key] = list(iter_dataset(run_cfg))
+                examples = capped[data_key]
+            run_method(
+                run_cfg, method, stats.setdefault(key, {}), workers, on_row, skip_ids, shared, pool, run_index, examples
+            )
+    stats["shared_stages"] = shared.stats()
+    # With workers, checkpoints are loaded in the child processes, not in this one.
+    stats["model_pool"] = _union_pools([loaded_models()] + [stats[key].pop("model_pool", []) for key, _, _ in runs])
+    return read_jsonl(path)
+
+
 def summarize_metrics(rows: List[Dict[str, Any]], run_dir: str) -> List[Dict[str, Any]]:
     metrics_rows = []
     for dataset in sorted(set(r["dataset"] for r in rows)):
@@ -305,53 +592,126 @@ def save_bootstrap(rows: List[Dict[str, Any]], run_dir: str, seed: int, n: int,
             )
 
 
-def run(cfg_path: str, method: str) -> str:
+def run(
+    cfg_path: str,
+    method: str,
+    workers: int = 1,
+    resume: bool = False,
+    run_dir: Optional[str] = None,
+    shard: Optional[Tuple[int, int]] = None,
+) -> str:
     cfg = load_config(cfg_path)
+    if shard is not None:
+        cfg["dataset"]["shard"] = list(shard)
     set_seeds(int(cfg["evaluation"]["seed"]))
-    run_dir = get_run_dir(cfg["logging"]["out_dir"])
-    rows = run_method(cfg, method)
-    write_jsonl(os.path.join(run_dir, "per_example.jsonl"), rows)
+    run_dir = get_run_dir(cfg["logging"]["out_dir"], run_dir)
+    stats: Dict[str, Any] = {}
+    rows = _stream_methods(cfg, [(method, method, cfg)], run_dir, stats, workers, resume, append=False)
     metrics_rows = summarize_metrics(rows, run_dir)
     write_csv(os.path.join(run_dir, "metrics.csv"), metrics_rows)
     save_json(os.path.join(run_dir, "config.json"), cfg)
+    save_json(os.path.join(run_dir, "run_stats.json"), stats)
     return run_dir
 
 
-def run_all(cfg_path: str) -> str:
+def run_all(
+    cfg_path: str,
+    workers: int = 1,
+    resume: bool = False,
+    run_dir: Optional[str] = None,
+    shard: Optional[Tuple[int, int]] = None,
+) -> str:
     cfg = load_config(cfg_path)
+    if shard is not None:
+        cfg["dataset"]["shard"] = list(shard)
     set_seeds(int(cfg["evaluation"]["seed"]))
-    run_dir = get_run_dir(cfg["logging"]["out_dir"])
-    all_rows = []
-    for method in ["direct", "random_question", "generic_clarify", "eig_ia"]:
-        all_rows.extend(run_method(cfg, method))
-    existing = []
-    if os.environ.get("EIG_IA_APPEND") and os.path.exists(os.path.join(run_dir, "per_example.jsonl")):
-        existing = read_jsonl(os.path.join(run_dir, "per_example.jsonl"))
-    combined = existing + all_rows
-    write_jsonl(os.path.join(run_dir, "per_example.jsonl"), combined)
+    run_dir = get_run_dir(cfg["logging"]["out_dir"], run_dir)
+    stats: Dict[str, Any] = {}
+    methods = ["direct", "random_question", "generic_clarify", "eig_ia"]
+    append = bool(os.environ.get("EIG_IA_APPEND"))
+    combined = _stream_methods(cfg, [(m, m, cfg) for m in methods], run_dir, stats, workers, resume, append)
     metrics_rows = summarize_metrics(combined, run_dir)
     write_csv(os.path.join(run_dir, "metrics.csv"), metrics_rows)
     save_json(os.path.join(run_dir, "config.json"), cfg)
+    save_json(os.path.join(run_dir, f"run_stats_{cfg['dataset']['name']}.json"), stats)
     save_bootstrap(combined, run_dir, int(cfg["evaluation"]["seed"]), int(cfg["evaluation"]["bootstrap"]["n"]), float(cfg["evaluation"]["bootstrap"]["alpha"]))
     return run_dir
 
 
-def sweep(cfg_path: str) -> str:
+def sweep(cfg_path: str, workers: int = 1, run_dir: Optional[str] = None) -> str:
     cfg = load_config(cfg_path)
-    run_dir = get_run_dir(cfg["logging"]["out_dir"])
-    all_rows = []
+    run_dir = get_run_dir(cfg["logging"]["out_dir"], run_dir)
+    stats: Dict[str, Any] = {}
+    runs = []
     for estimator in ["entropy", "utility"]:
         for k in [cfg["eig"]["K_questions"], cfg["eig"]["K_questions"] * 2]:
-            cfg["eig"]["estimator"] = estimator
-            cfg["eig"]["K_questions"] = k
-            all_rows.extend(run_method(cfg, "eig_ia"))
-    write_jsonl(os.path.join(run_dir, "per_example.jsonl"), all_rows)
+            run_cfg = copy.deepcopy(cfg)
+            run_cfg["eig"]["estimator"] = estimator
+            run_cfg["eig"]["K_questions"] = k
+            runs.append((f"eig_ia_{estimator}_k{k}", "eig_ia", run_cfg))
+    # Sweep variants share the method name, so they cannot be told apart for resume.
+    all_rows = _stream_methods(cfg, runs, run_dir, stats, workers, resume=False, append=False)
     metrics_rows = summarize_metrics(all_rows, run_dir)
     write_csv(os.path.join(run_dir, "metrics.csv"), metrics_rows)
-    save_json(os.path.join(run_dir, "config.json"), cfg)
+    save_json(os.path.join(run_dir, "config.json"), runs[-1][2])
+    save_json(os.path.join(run_dir, "run_stats.json"), stats)
     return run_dir
 
 
+def merge(shard_dirs: List[str], out_dir: str) -> str:
+    """Combine per-shard run directories, validate coverage, and compute metrics once on the union."""
+    rows: List[Dict[str, Any]] = []
+    cfgs = []
+    for shard_dir in shard_dirs:
+        rows.extend(read_jsonl(os.path.join(shard_dir, "per_example.jsonl")))
+        cfg_path = os.path.join(shard_dir, "config.json")
+        if os.path.exists(cfg_path):
+            with open(cfg_path, "r", encoding="utf-8") as f:
+                cfgs.append(json.load(f))
+
+    seen = set()
+    duplicates = set()
+    ids: Dict[Tuple[str, str], Set[str]] = {}
+    for r in rows:
+        key = (r["dataset"], r["method"], str(r["example_id"]))
+        if key in seen:
+            duplicates.add(key)
+        seen.add(key)
+        ids.setdefault((r["dataset"], r["method"]), set()).add(str(r["example_id"]))
+    if duplicates:
+        raise ValueError(f"Duplicate rows across shards: {sorted(duplicates)[:10]} ({len(duplicates)} total)")
+
+    missing = []
+    for dataset in sorted({d for d, _ in ids}):
+        union = set().union(*(v for (d, _), v in ids.items() if d == dataset))
+        for (d, method), present in sorted(ids.items()):
+            if d == dataset and present != union:
+                missing.append((dataset, method, sorted(union - present)[:10], len(union - present)))
+    if missing:
+        raise ValueError(f"Missing examples in merged shards (dataset, method, ids, count): {missing}")
+    shards = {tuple(c["dataset"]["shard"]) for c in cfgs if c["dataset"].get("shard")}
+    if shards:
+        totals = {n for _, n in shards}
+        if len(totals) != 1 or {i for i, _ in shards} != set(range(totals.pop())):
+            raise ValueError(f"Incomplete or inconsistent shard set: {sorted(shards)}")
+
+    # Restore dataset order so paired bootstrap lines rows up by example across methods.
+    datasets = list(dict.fromkeys(r["dataset"] for r in rows))
+    methods = list(dict.fromkeys(r["method"] for r in rows))
+    rows.sort(key=lambda r: (datasets.index(r["dataset"]), methods.index(r["method"]), r.get("example_idx", 0)))
+
+    os.makedirs(out_dir, exist_ok=True)
+    write_jsonl(os.path.join(out_dir, "per_example.jsonl"), rows)
+    metrics_rows = summarize_metrics(rows, out_dir)
+    write_csv(os.path.join(out_dir, "metrics.csv"), metrics_rows)
+    if cfgs:
+        cfg = copy.deepcopy(cfgs[0])
+        cfg["dataset"].pop("shard", None)
+        save_json(os.path.join(out_dir, "config.json"), cfg)
+        save_bootstrap(rows, out_dir, int(cfg["evaluation"]["seed"]), int(cfg["evaluation"]["bootstrap"]["n"]), float(cfg["evaluation"]["bootstrap"]["alpha"]))
+    return out_dir
+
+
 def make_tables(results_dir: str) -> None:
     from src.viz.latex_tables import make_tables as _make_tables
 
@@ -376,16 +736,31 @@ def main() -> None:
     sub.add_parser("download_data")
     preprocess_p = sub.add_parser("preprocess")
     preprocess_p.add_argument("--dataset", default="art")
+    preprocess_p.add_argument("--split", default="dev")
 
     run_p = sub.add_parser("run")
     run_p.add_argument("--config", required=True)
     run_p.add_argument("--method", required=True)
+    run_p.add_argument("--workers", type=int, default=1)
+    run_p.add_argument("--resume", action="store_true")
+    run_p.add_argument("--run_dir", default=None)
+    run_p.add_argument("--shard", type=parse_shard, default=None, help="process slice i/n of the dataset")
 
     run_all_p = sub.add_parser("run_all")
     run_all_p.add_argument("--config", required=True)
+    run_all_p.add_argument("--workers", type=int, default=1)
+    run_all_p.add_argument("--resume", action="store_true")
+    run_all_p.add_argument("--run_dir", default=None)
+    run_all_p.add_argument("--shard", type=parse_shard, default=None, help="process slice i/n of the dataset")
 
     sweep_p = sub.add_parser("sweep")
     sweep_p.add_argument("--config", required=True)
+    sweep_p.add_argument("--workers", type=int, default=1)
+    sweep_p.add_argument("--run_dir", default=None)
+
+    merge_p = sub.add_parser("merge")
+    merge_p.add_argument("--shard_dirs", nargs="+", required=True)
+    merge_p.add_argument("--out_dir", required=True)
 
     tables_p = sub.add_parser("make_tables")
     tables_p.add_argument("--results_dir", required=True)
@@ -405,13 +780,16 @@ def main() -> None:
     elif args.command == "preprocess":
         cfg = load_config("configs/default.yaml")
         cfg["dataset"]["name"] = args.dataset
+        cfg["dataset"]["split"] = args.split
         preprocess(cfg)
     elif args.command == "run":
-        run(args.config, args.method)
+        run(args.config, args.method, args.workers, args.resume, args.run_dir, args.shard)
     elif args.command == "run_all":
-        run_all(args.config)
+        run_all(args.config, args.workers, args.resume, args.run_dir, args.shard)
     elif args.command == "sweep":
-        sweep(args.config)
+        sweep(args.config, args.workers, args.run_dir)
+    elif args.command == "merge":
+        merge(args.shard_dirs, args.out_dir)
     elif args.command == "make_tables":
         make_tables(args.results_dir)
     elif args.command == "make_plots":
@@ -0,0 +1,64 @@
+import argparse
+import json
+import random
+import re
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def _tokens(text: str):
+    return [(m.start(), m.group()) for m in re.finditer(r"\s*\S+", text)]
+
+
+class Handler(BaseHTTPRequestHandler):
+    fail_rate = 0.0
+
+    def log_message(self, format, *args):  # noqa: A002
+        pass
+
+    def _send(self, status: int, body: dict) -> None:
+        raw = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(raw)))
+        self.end_headers()
+        self.wfile.write(raw)
+
+    def do_POST(self) -> None:  # noqa: N802
+        length = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        if random.random() < self.fail_rate:
+            self._send(429, {"error": {"message": "rate limited"}})
+            return
+        if self.path.endswith("/chat/completions"):
+            prompt = payload["messages"][-1]["content"]
+            choices = [
+                {"index": i, "message": {"role": "assistant", "content": random.choice(["yes", "no"])}}
+                for i in range(int(payload.get("n", 1)))
+            ]
+            usage = {"prompt_tokens": len(_tokens(prompt)), "completion_tokens": len(choices)}
+            self._send(200, {"choices": choices, "usage": usage})
+        elif self.path.endswith("/completions"):
+            toks = _tokens(payload["prompt"])
+            logprobs = {
+                "tokens": [t for _, t in toks],
+                "text_offset": [o for o, _ in toks],
+                "token_logprobs": [None] + [-0.1 * len(t) for _, t in toks[1:]],
+            }
+            self._send(200, {"choices": [{"text": payload["prompt"], "logprobs": logprobs}]})
+        else:
+            self._send(404, {"error": {"message": f"unknown path {self.path}"}})
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Minimal OpenAI-compatible stand-in server for APILLM runs.")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--fail_rate", type=float, default=0.0, help="fraction of requests answered with HTTP 429")
+    args = parser.parse_args()
+    Handler.fail_rate = args.fail_rate
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), Handler)
+    print(f"Serving on http://127.0.0.1:{args.port}/v1")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,19 @@
-from typing import Any, Dict, List
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Optional
 
+from datasets import config as datasets_config
 from datasets import load_dataset
 
+from .processed_cache import iter_processed, normalize_split, processed_path
+
+
+def _as_answer_list(answers: Any) -> List[str]:
+    if answers is None:
+        return []
+    if isinstance(answers, (list, tuple)):
+        return [str(a) for a in answers]
+    return [str(answers)]
+
 
 def _extract_example(example: Dict[str, Any]) -> Dict[str, Any]:
     question = example.get("question") or example.get("ambiguous_question") or ""
@@ -37,27 +49,39 @@ def _extract_example(example: Dict[str, Any]) -> Dict[str, Any]:
         "id": str(example.get("id", example.get("question_id", ""))),
         "question": question.strip(),
         "rewrites": rewrite_texts,
-        "answer_sets": answer_sets,
+        "answer_sets": [_as_answer_list(a) for a in answer_sets],
     }
 
 
-def load_ambigqa(split: str = "validation", max_examples: int = 0) -> List[Dict[str, Any]]:
+def iter_ambigqa(
+    split: str = "validation", processed_dir: Optional[str] = None, streaming: bool = False
+) -> Iterator[Dict[str, Any]]:
+    """Yield parsed examples with at least one rewrite lazily, from the processed cache or the Hub.
+
+    streaming=True reads the split over the network without caching it; use it only for short prefixes.
+    With HF_DATASETS_OFFLINE set, the split is read from the local datasets cache instead.
+    """
+    if processed_dir:
+        cached = iter_processed(processed_path(processed_dir, "ambigqa", split))
+        if cached is not None:
+            yield from cached
+            return
+    ds_split = normalize_split(split)
+    streaming = streaming and not datasets_config.HF_DATASETS_OFFLINE
     dataset = None
     for name in ["ambig_qa", "ambigqa", "ambignq", "ambig_nq"]:
         try:
-            dataset = load_dataset(name)
+            dataset = load_dataset(name, split=ds_split, streaming=streaming)
             break
         except Exception:
             continue
     if dataset is None:
         raise RuntimeError("Could not load AmbigQA/AmbigNQ dataset from Hugging Face.")
-    ds_split = "validation" if split in {"dev", "validation"} else split
-    examples = []
-    for ex in dataset[ds_split]:
+    for ex in dataset:
         parsed = _extract_example(ex)
-        if not parsed["rewrites"]:
-            continue
-        examples.append(parsed)
-        if max_examples and len(examples) >= max_examples:
-            break
-    return examples
+        if parsed["rewrites"]:
+            yield parsed
+
+
+def load_ambigqa(split: str = "validation", max_examples: int = 0, processed_dir: Optional[str] = None) -> List[Dict[str, Any]]:
+    return list(islice(iter_ambigqa(split, processed_dir, streaming=max_examples > 0), max_examples or None))
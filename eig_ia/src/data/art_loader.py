@@ -1,7 +1,11 @@
-from typing import Any, Dict, List
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Optional
 
+from datasets import config as datasets_config
 from datasets import load_dataset
 
+from .processed_cache import iter_processed, normalize_split, processed_path
+
 
 def _extract_example(example: Dict[str, Any]) -> Dict[str, Any]:
     keys = set(example.keys())
@@ -29,20 +33,33 @@ def _extract_example(example: Dict[str, Any]) -> Dict[str, Any]:
     }
 
 
-def load_art(split: str = "validation", max_examples: int = 0) -> List[Dict[str, Any]]:
+def iter_art(
+    split: str = "validation", processed_dir: Optional[str] = None, streaming: bool = False
+) -> Iterator[Dict[str, Any]]:
+    """Yield parsed examples lazily, from the processed cache if present, else from the Hub.
+
+    streaming=True reads the split over the network without caching it; use it only for short prefixes.
+    With HF_DATASETS_OFFLINE set, the split is read from the local datasets cache instead.
+    """
+    if processed_dir:
+        cached = iter_processed(processed_path(processed_dir, "art", split))
+        if cached is not None:
+            yield from cached
+            return
+    ds_split = normalize_split(split)
+    streaming = streaming and not datasets_config.HF_DATASETS_OFFLINE
     dataset = None
     for name in ["art", "alpha_nli", "anli"]:
         try:
-            dataset = load_dataset(name)
+            dataset = load_dataset(name, split=ds_split, streaming=streaming)
             break
         except Exception:
             continue
     if dataset is None:
         raise RuntimeError("Could not load ART/alphaNLI dataset from Hugging Face.")
-    ds_split = "validation" if split in {"dev", "validation"} else split
-    examples = []
-    for ex in dataset[ds_split]:
-        examples.append(_extract_example(ex))
-        if max_examples and len(examples) >= max_examples:
-            break
-    return examples
+    for ex in dataset:
+        yield _extract_example(ex)
+
+
+def load_art(split: str = "validation", max_examples: int = 0, processed_dir: Optional[str] = None) -> List[Dict[str, Any]]:
+    return list(islice(iter_art(split, processed_dir, streaming=max_examples > 0), max_examples or None))
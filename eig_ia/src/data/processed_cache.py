@@ -0,0 +1,30 @@
+import os
+from typing import Any, Dict, Iterator, List, Optional
+
+PROCESSED_VERSION = 1
+
+
+def normalize_split(split: str) -> str:
+    return "validation" if split in {"dev", "validation"} else split
+
+
+def processed_path(root: str, name: str, split: str) -> str:
+    return os.path.join(root, f"{name}_{normalize_split(split)}_v{PROCESSED_VERSION}")
+
+
+def save_processed(examples: List[Dict[str, Any]], path: str) -> str:
+    """Write normalized examples as an Arrow dataset directory (loaded memory-mapped later)."""
+    from datasets import Dataset
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    Dataset.from_list(examples).save_to_disk(path)
+    return path
+
+
+def iter_processed(path: str) -> Optional[Iterator[Dict[str, Any]]]:
+    """Memory-map a processed split and iterate its rows lazily; None if it was never written."""
+    if not os.path.isdir(path):
+        return None
+    from datasets import load_from_disk
+
+    return iter(load_from_disk(path))
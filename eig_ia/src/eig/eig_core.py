@@ -0,0 +1,60 @@
+from typing import List
+
+import numpy as np
+
+
+def log_softmax(scores: np.ndarray) -> np.ndarray:
+    scores = np.asarray(scores, dtype=np.float64)
+    shifted = scores - scores.max(axis=-1, keepdims=True)
+    return shifted - np.log(np.exp(shifted).sum(axis=-1, keepdims=True))
+
+
+def softmax(scores: np.ndarray) -> np.ndarray:
+    return np.exp(log_softmax(scores))
+
+
+def entropies(log_probs: np.ndarray) -> np.ndarray:
+    probs = np.exp(log_probs)
+    with np.errstate(invalid="ignore"):
+        return -np.where(probs > 0, probs * log_probs, 0.0).sum(axis=-1)
+
+
+def max_gain(prior_probs: List[float], estimator: str) -> float:
+    """Largest gain any posterior can reach: the prior entropy, or 1 - max prior for utility."""
+    prior = np.asarray(prior_probs, dtype=np.float64)
+    if estimator == "utility":
+        return float(1.0 - prior.max())
+    with np.errstate(divide="ignore"):
+        return float(entropies(np.log(prior)))
+
+
+def answer_cap(prior_probs: List[float], answer_weights: List[float], estimator: str) -> float:
+    """Cap on a question's EIG from its answer distribution: min(H(prior), H(answers)) for entropy.
+
+    For utility it is min(1 - max prior, (answers - 1) * max prior). Both hold when the posteriors
+    are Bayes-consistent with the prior and answer weights.
+    """
+    w = np.asarray([x for x in answer_weights if x > 0], dtype=np.float64)
+    if estimator == "utility":
+        return min(max_gain(prior_probs, estimator), (len(w) - 1) * max(prior_probs))
+    return min(max_gain(prior_probs, estimator), float(entropies(np.log(w)))) if len(w) else 0.0
+
+
+def gains(log_posteriors: np.ndarray, prior_probs: List[float], estimator: str) -> np.ndarray:
+    """Per-answer information gain for every posterior in a (..., hypotheses) log-prob array."""
+    if estimator == "utility":
+        return np.exp(log_posteriors).max(axis=-1) - max(prior_probs)
+    return max_gain(prior_probs, estimator) - entropies(log_posteriors)
+
+
+def eig_scores(log_scores: np.ndarray, weights: np.ndarray, prior_probs: List[float], estimator: str) -> np.ndarray:
+    """EIG per question from a (questions, answers, hypotheses) log-score tensor and (questions, answers) weights.
+
+    Log scores are normalized over hypotheses here, so raw scorer log-likelihoods can be passed in.
+    cumsum adds answers strictly in column order (zero weight pads ragged rows), so the result matches
+    a sequential sum over each question's answers bit for bit.
+    """
+    g = gains(log_softmax(log_scores), prior_probs, estimator)
+    if g.shape[1] == 0:
+        return np.zeros(g.shape[0])
+    return np.cumsum(weights * g, axis=1)[:, -1]
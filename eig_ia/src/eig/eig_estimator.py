@@ -1,29 +1,272 @@
+import math
 from collections import Counter
-from typing import Any, Dict, List, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
-from ..modules.answer_simulator import simulate_answer
-from ..modules.hypothesis_scorer import score_hypotheses
-from .posterior import entropy, max_prob
+import numpy as np
 
+from ..llm.tokenizer_utils import merge_usage
+from ..modules.answer_clustering import assign_clusters
+from ..modules.answer_simulator import answer_distribution_art, simulate_answers
+from ..modules.hypothesis_scorer import log_posteriors_batch
+from .eig_core import eig_scores as eig_scores_array
+from .eig_core import answer_cap, gains, log_softmax, max_gain
+from .gating import BOUND_EPS
 
-def estimate_eig(
+
+def estimate_eig_batch(
     dataset: str,
     observation: str,
     hypotheses: List[str],
-    question: str,
+    questions: List[str],
     prior_probs: List[float],
     llm_answer,
     llm_scorer,
     m_answers: int,
     estimator: str,
-) -> Tuple[float, Dict[str, Any]]:
-    answers, meta = simulate_answer(dataset, question, llm_answer, m_answers)
-    counts = Counter(answers)
-    eig_values = []
-    for answer, count in counts.items():
-        posterior, _ = score_hypotheses(dataset, observation, hypotheses, llm_scorer, question, answer)
-        if estimator == "utility":
-            eig_values.append((count / m_answers) * (max_prob(posterior) - max_prob(prior_probs)))
-        else:
-            eig_values.append((count / m_answers) * (entropy(prior_probs) - entropy(posterior)))
-    return sum(eig_values), {"answers": answers, **meta}
+    simulated: Optional[List[Tuple[List[str], Dict[str, Any]]]] = None,
+    answer_dist: str = "sample",
+    selection: str = "exhaustive",
+    adaptive: Optional[Dict[str, Any]] = None,
+    answer_clustering: Optional[Dict[str, Any]] = None,
+    question_dedup: Optional[Dict[str, Any]] = None,
+) -> Tuple[List[float], List[Dict[str, Any]]]:
+    """Estimate EIG for every candidate question with batched posterior scoring requests.
+
+    answer_dist: "sample" or "exact" (ART yes/no); selection: "exhaustive" or "bnb"; adaptive: racing
+    config (see _race); answer_clustering, question_dedup: assign_clusters configs.
+    """
+    if question_dedup and question_dedup.get("method", "none") != "none":
+        unique: List[str] = []
+        assigned = assign_clusters(questions, unique, question_dedup)
+        if len(unique) < len(questions):
+            first = [questions.index(q) for q in unique]
+            scores, metas = estimate_eig_batch(
+                dataset,
+                observation,
+                hypotheses,
+                unique,
+                prior_probs,
+                llm_answer,
+                llm_scorer,
+                m_answers,
+                estimator,
+                None if simulated is None else [simulated[i] for i in first],
+                answer_dist,
+                selection,
+                adaptive,
+                answer_clustering,
+            )
+            index = [unique.index(q) for q in assigned]
+            eig_meta = [metas[j] if first[j] == i else {"duplicate_of": first[j]} for i, j in enumerate(index)]
+            return [scores[j] for j in index], eig_meta
+    posteriors: Dict[Tuple[str, str], np.ndarray] = {}
+
+    def score(items: List[Tuple[int, str]]) -> np.ndarray:
+        pairs = [(questions[i], a) for i, a in items]
+        missing = [pair for pair in dict.fromkeys(pairs) if pair not in posteriors]
+        if missing:
+            log_probs, _ = log_posteriors_batch(dataset, observation, hypotheses, llm_scorer, missing)
+            posteriors.update(zip(missing, log_probs))
+        return np.array([posteriors[pair] for pair in pairs]).reshape(len(pairs), len(hypotheses))
+
+    def item_gains(items: List[Tuple[int, str]]) -> np.ndarray:
+        return gains(log_softmax(score(items)), prior_probs, estimator)
+
+    if adaptive and simulated is None and not (answer_dist == "exact" and dataset == "art"):
+        # Per-sample gains lie in [H(prior) - log|H|, H(prior)], or within a width-1 range for utility.
+        gain_range = 1.0 if estimator == "utility" else math.log(max(1, len(hypotheses)))
+        return _race(
+            dataset,
+            questions,
+            llm_answer,
+            m_answers,
+            adaptive,
+            lambda items: item_gains(items).tolist(),
+            gain_range,
+            answer_clustering,
+        )
+
+    weights, answer_meta = _answer_weights(dataset, questions, llm_answer, m_answers, simulated, answer_dist, answer_clustering)
+    # Heaviest answers first: they move the bound the most, and both modes sum in this order.
+    ordered = [sorted(w.items(), key=lambda item: -item[1]) for w in weights]
+    if selection == "bnb":
+        caps = [answer_cap(prior_probs, list(w.values()), estimator) for w in weights]
+        eig_scores, scored = _branch_and_bound(ordered, item_gains, max_gain(prior_probs, estimator), caps)
+    else:
+        eig_scores = _exhaustive(ordered, score, len(hypotheses), prior_probs, estimator)
+        scored = [len(o) for o in ordered]
+    eig_meta = [
+        {**meta, "answers_scored": n, "eig_pruned": n < len(o)} for meta, n, o in zip(answer_meta, scored, ordered)
+    ]
+    return eig_scores, eig_meta
+
+
+def _exhaustive(
+    ordered: List[List[Tuple[str, float]]],
+    score: Callable[[List[Tuple[int, str]]], np.ndarray],
+    n_hypotheses: int,
+    prior_probs: List[float],
+    estimator: str,
+) -> List[float]:
+    # One scoring request, then the whole (questions, answers, hypotheses) tensor in one pass.
+    n_answers = max((len(o) for o in ordered), default=0)
+    log_scores = np.zeros((len(ordered), n_answers, n_hypotheses))
+    weights = np.zeros((len(ordered), n_answers))
+    items = [(i, a) for i, o in enumerate(ordered) for a, _ in o]
+    rows = iter(score(items)) if items else iter(())
+    for i, o in enumerate(ordered):
+        for j, (_, w) in enumerate(o):
+            log_scores[i, j] = next(rows)
+            weights[i, j] = w
+    return eig_scores_array(log_scores, weights, prior_probs, estimator).tolist()
+
+
+def _branch_and_bound(
+    ordered: List[List[Tuple[str, float]]],
+    item_gains: Callable[[List[Tuple[int, str]]], np.ndarray],
+    cap: float,
+    totals: List[float],
+) -> Tuple[List[float], List[int]]:
+    # Each unscored answer of weight w adds at most w * cap (prior entropy, or 1 - prior max), and a
+    # candidate's whole estimate is at most its answer cap, so the smaller of the two bounds it.
+    n = len(ordered)
+    partial = [0.0] * n
+    pos = [0] * n
+
+    def done(i: int) -> bool:
+        return pos[i] == len(ordered[i])
+
+    def bound(i: int) -> float:
+        if done(i):
+            return partial[i]
+        return min(partial[i] + sum(w for _, w in ordered[i][pos[i]:]) * cap, totals[i]) + BOUND_EPS
+
+    def advance(items: List[Tuple[int, str, float]]) -> None:
+        if not items:
+            return
+        for (i, _, w), g in zip(items, item_gains([(i, a) for i, a, _ in items])):
+            partial[i] += w * float(g)
+            pos[i] += 1
+
+    def beats(value: float, i: int, best: Optional[Tuple[float, int]]) -> bool:
+        # Same tie-break as max() over indices: the earlier candidate wins.
+        return best is None or (value, -i) > (best[0], -best[1])
+
+    best: Optional[Tuple[float, int]] = None
+    active = list(range(n))
+    if active:
+        # Finish the most promising candidate first, so the rest can be pruned on their caps alone.
+        lead = max(active, key=lambda i: (bound(i), -i))
+        advance([(lead, a, w) for a, w in ordered[lead]])
+    while active:
+        for i in active:
+            if done(i) and beats(partial[i], i, best):
+                best = (partial[i], i)
+        active = [i for i in active if not done(i) and beats(bound(i), i, best)]
+        advance([(i, *ordered[i][pos[i]]) for i in active])
+    return [bound(i) for i in range(n)], pos
+
+
+def _race(
+    dataset: str,
+    questions: List[str],
+    llm_answer,
+    m_answers: int,
+    adaptive: Dict[str, Any],
+    gains: Callable[[List[Tuple[int, str]]], List[float]],
+    gain_range: float,
+    answer_clustering: Optional[Dict[str, Any]] = None,
+) -> Tuple[List[float], List[Dict[str, Any]]]:
+    """Sequential Monte Carlo EIG, dropping questions whose gain interval falls below the best one.
+
+    adaptive: round_size, budget, min_samples, delta; gain_range bounds each per-sample gain.
+    """
+    round_size = max(1, int(adaptive.get("round_size", 2)))
+    budget = int(adaptive.get("budget") or len(questions) * m_answers)
+    min_samples = max(2, int(adaptive.get("min_samples", 4)))
+    tests = len(questions) * max(1, math.ceil(m_answers / round_size))
+    # Two-sided, two bounds per test, union over every question and round.
+    log_term = math.log(4 * tests / float(adaptive.get("delta", 0.05)))
+    samples: List[List[float]] = [[] for _ in questions]
+    answers: List[List[str]] = [[] for _ in questions]
+    reps: List[List[str]] = [[] for _ in questions]
+    usage = [merge_usage(0, 0) for _ in questions]
+    latency = [0.0 for _ in questions]
+    prompts = ["" for _ in questions]
+    spent = 0
+    live = list(range(len(questions)))
+
+    def interval(i: int) -> Tuple[float, float]:
+        n = len(samples[i])
+        mean = sum(samples[i]) / n
+        if n < 2:
+            return mean, mean
+        sd = math.sqrt(sum((g - mean) ** 2 for g in samples[i]) / (n - 1))
+        # Tighter of Hoeffding and empirical Bernstein (Maurer & Pontil, 2009); both are driven by
+        # the gain range, so the width stays positive when the draws so far agree.
+        hoeffding = gain_range * math.sqrt(log_term / (2 * n))
+        bernstein = sd * math.sqrt(2 * log_term / n) + 7 * gain_range * log_term / (3 * (n - 1))
+        half = min(hoeffding, bernstein)
+        return mean - half, mean + half
+
+    while live:
+        n_draw = min(round_size, (budget - spent) // len(live), *(m_answers - len(samples[i]) for i in live))
+        if n_draw <= 0:
+            break
+        drawn = simulate_answers(dataset, [questions[i] for i in live], llm_answer, n_draw)
+        raw = [(i, a) for i, (new_answers, _) in zip(live, drawn) for a in new_answers]
+        items = [(i, assign_clusters([a], reps[i], answer_clustering)[0]) for i, a in raw]
+        for (i, a), g in zip(raw, gains(items)):
+            answers[i].append(a)
+            samples[i].append(g)
+        for i, (new_answers, meta) in zip(live, drawn):
+            u = meta.get("usage", {})
+            usage[i] = merge_usage(usage[i]["tokens_in"] + u.get("tokens_in", 0), usage[i]["tokens_out"] + u.get("tokens_out", 0))
+            latency[i] += float(meta.get("latency", 0.0))
+            prompts[i] = meta.get("prompt", "")
+            spent += len(new_answers)
+        if min(len(samples[i]) for i in live) >= min_samples:
+            best_lower = max(interval(i)[0] for i in live)
+            live = [i for i in live if interval(i)[1] >= best_lower]
+        if len(live) == 1:
+            break
+    eig_scores = [sum(g) / len(g) if g else 0.0 for g in samples]
+    eig_meta = [
+        {
+            "answers": answers[i],
+            "prompt": prompts[i],
+            "usage": usage[i],
+            "latency": latency[i],
+            "answers_sampled": len(answers[i]),
+            "answer_clusters": len(reps[i]),
+        }
+        for i in range(len(questions))
+    ]
+    return eig_scores, eig_meta
+
+
+def _answer_weights(
+    dataset: str,
+    questions: List[str],
+    llm_answer,
+    m_answers: int,
+    simulated: Optional[List[Tuple[List[str], Dict[str, Any]]]],
+    answer_dist: str,
+    answer_clustering: Optional[Dict[str, Any]] = None,
+) -> Tuple[List[Dict[str, float]], List[Dict[str, Any]]]:
+    if answer_dist == "exact" and dataset == "art" and simulated is None:
+        dists = answer_distribution_art(questions, llm_answer)
+        weights = [dist for dist, _ in dists]
+        metas = [{"answers": list(dist), "answer_probs": list(dist.values()), **meta} for dist, meta in dists]
+        return weights, metas
+    if simulated is None:
+        simulated = simulate_answers(dataset, questions, llm_answer, m_answers)
+    weights = []
+    metas = []
+    for answers, meta in simulated:
+        reps: List[str] = []
+        counts = Counter(assign_clusters(answers, reps, answer_clustering))
+        weights.append({a: count / m_answers for a, count in counts.items()})
+        metas.append({"answers": answers, "answer_clusters": len(reps), **meta})
+    return weights, metas
+
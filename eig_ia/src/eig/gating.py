@@ -1,7 +1,22 @@
 from typing import List
 
+from .eig_core import max_gain
 from .posterior import max_prob
 
+# Slack for float rounding in the weighted sums, so a bound never undercuts a computed estimate.
+BOUND_EPS = 1e-9
+
 
 def should_ask(prior_probs: List[float], eig_value: float, tau: float, gamma: float) -> bool:
     return max_prob(prior_probs) < tau or eig_value > gamma
+
+
+def eig_upper_bound(prior_probs: List[float], estimator: str) -> float:
+    # Posterior entropy is non-negative and posterior max is at most 1, so no answer distribution
+    # can gain more than the prior entropy (or 1 - prior max for the utility estimator).
+    return max_gain(prior_probs, estimator) + BOUND_EPS
+
+
+def gate_decided_by_prior(prior_probs: List[float], estimator: str, tau: float, gamma: float) -> bool:
+    """True when should_ask is False for every possible EIG value, so EIG need not be estimated."""
+    return max_prob(prior_probs) >= tau and eig_upper_bound(prior_probs, estimator) <= gamma
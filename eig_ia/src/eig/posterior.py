@@ -1,5 +1,5 @@
 import math
-from typing import List
+from typing import List, Tuple
 
 
 def entropy(probs: List[float]) -> float:
@@ -12,3 +12,21 @@ def entropy(probs: List[float]) -> float:
 
 def max_prob(probs: List[float]) -> float:
     return max(probs) if probs else 0.0
+
+
+def prune_by_mass(probs: List[float], mass: float = 1.0, top_k: int = 0) -> Tuple[List[int], float]:
+    """Indices (in original order) of the most probable entries covering `mass`, at most top_k of them.
+
+    Also returns the dropped probability mass, which bounds the total variation distance between
+    probs and its renormalized restriction to the kept entries.
+    """
+    order = sorted(range(len(probs)), key=lambda i: -probs[i])
+    kept: List[int] = []
+    covered = 0.0
+    for i in order:
+        if covered >= mass or (top_k and len(kept) >= top_k):
+            break
+        kept.append(i)
+        covered += probs[i]
+    # Sum the dropped entries directly, so keeping every entry reports exactly 0.0.
+    return sorted(kept), sum((probs[i] for i in order[len(kept):]), 0.0)
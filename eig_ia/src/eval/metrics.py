@@ -76,6 +76,7 @@ def compute_metrics(rows: List[Dict[str, Any]]) -> Dict[str, float]:
     metrics = {
         "accuracy": compute_accuracy(rows),
         "eig": compute_eig(rows),
+        "gate_pruned": sum(1 for r in rows if r.get("gate_pruned")),
     }
     metrics.update(compute_entropy_metrics(rows))
     metrics.update(compute_latency(rows))
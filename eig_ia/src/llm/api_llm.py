@@ -1,50 +1,211 @@
+import asyncio
 import os
-from typing import Any, Dict, List, Tuple
+import random
+import re
+import threading
+import time
+from typing import Any, Coroutine, Dict, List, Optional, Tuple
 
 from .llm_base import LLMBase
+from .tokenizer_utils import merge_usage
+
+DEFAULT_API_BASE = "https://api.openai.com/v1"
+RETRY_STATUS = {429, 500, 502, 503, 504}
+# OpenAI models served only on /chat/completions, which cannot echo prompt logprobs for scoring.
+CHAT_ONLY_MODELS = re.compile(r"^(gpt-3\.5-turbo(?!-instruct)|gpt-[4-9]|o[1-9]|chatgpt-)")
+
+
+class _TokenBucket:
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
 
 
 class APILLM(LLMBase):
-    def __init__(self, model_id: str, decoding_params: Dict[str, Any]):
+    """OpenAI-compatible HTTP backend.
+
+    Requests run on a private event loop thread that owns one pooled httpx.AsyncClient, so
+    synchronous callers can still fan many requests out concurrently. In-flight requests are
+    capped by max_concurrency, started at most requests_per_second (0 disables the limit),
+    and retried with jittered exponential backoff on 429/5xx and transport errors.
+    """
+
+    def __init__(
+        self,
+        model_id: str,
+        decoding_params: Dict[str, Any],
+        max_concurrency: int = 8,
+        api_base: Optional[str] = None,
+        requests_per_second: float = 0.0,
+        max_retries: int = 5,
+        timeout: float = 60.0,
+    ):
         super().__init__(model_id, decoding_params)
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.api_base = (api_base or os.environ.get("OPENAI_BASE_URL") or DEFAULT_API_BASE).rstrip("/")
+        self.requests_per_second = float(requests_per_second)
+        self.max_retries = int(max_retries)
+        self.timeout = float(timeout)
         self.api_key = os.environ.get("OPENAI_API_KEY") or os.environ.get("ANTHROPIC_API_KEY")
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._client = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._bucket: Optional[_TokenBucket] = None
+        self._start_lock = threading.Lock()
+        self.retries = 0
+        self.requests = 0
+        self._rng: Optional[random.Random] = None
+
+    def reseed(self, seed: int) -> None:
+        self._rng = random.Random(seed)
 
     def _check(self) -> None:
-        if not self.api_key:
+        if not self.api_key and self.api_base == DEFAULT_API_BASE:
             raise RuntimeError("API key not found in OPENAI_API_KEY or ANTHROPIC_API_KEY")
         try:
-            import openai  # type: ignore
+            import httpx  # type: ignore  # noqa: F401
         except Exception as exc:
-            raise RuntimeError("openai package not installed; install it to use APILLM") from exc
+            raise RuntimeError("httpx package not installed; install it to use APILLM") from exc
 
-    def generate(self, prompt: str, n: int = 1) -> Tuple[List[str], Dict[str, Any]]:
+    def _check_scorer(self) -> None:
+        if CHAT_ONLY_MODELS.match(self.model_id):
+            raise ValueError(
+                f"{self.model_id!r} is a chat-only model and cannot score completions; scoring needs a "
+                "/completions model with echo and logprobs (e.g. davinci-002) as scorer_model"
+            )
+
+    def _run(self, coro: Coroutine[Any, Any, Any]) -> Any:
         self._check()
-        import openai  # type: ignore
-
-        response = openai.ChatCompletion.create(
-            model=self.model_id,
-            messages=[{"role": "user", "content": prompt}],
-            n=n,
-            temperature=float(self.decoding_params.get("temperature", 0.7)),
-            max_tokens=int(self.decoding_params.get("max_new_tokens", 128)),
+        with self._start_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name=f"apillm-{self.model_id}", daemon=True).start()
+                asyncio.run_coroutine_threadsafe(self._setup(), loop).result()
+                self._loop = loop
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    async def _setup(self) -> None:
+        import httpx  # type: ignore
+
+        headers = {"Authorization": f"Bearer {self.api_key}"} if self.api_key else {}
+        self._client = httpx.AsyncClient(
+            base_url=self.api_base,
+            headers=headers,
+            timeout=self.timeout,
+            limits=httpx.Limits(max_connections=self.max_concurrency, max_keepalive_connections=self.max_concurrency),
         )
-        texts = [choice.message["content"].strip() for choice in response.choices]
-        usage = response.get("usage", {})
-        return texts, {"latency": 0.0, "usage": usage}
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._bucket = _TokenBucket(self.requests_per_second, self.max_concurrency)
+
+    async def _post(self, path: str, payload: Dict[str, Any]) -> Tuple[Dict[str, Any], float]:
+        import httpx  # type: ignore
+
+        start = time.perf_counter()
+        for attempt in range(self.max_retries + 1):
+            await self._bucket.acquire()
+            async with self._semaphore:
+                self.requests += 1
+                try:
+                    response = await self._client.post(path, json=payload)
+                except httpx.TransportError:
+                    if attempt == self.max_retries:
+                        raise
+                    response = None
+            if response is not None and response.status_code not in RETRY_STATUS:
+                response.raise_for_status()
+                return response.json(), time.perf_counter() - start
+            if attempt == self.max_retries:
+                response.raise_for_status()
+            self.retries += 1
+            delay = min(30.0, 0.5 * 2**attempt) * random.uniform(0.5, 1.0)
+            retry_after = response.headers.get("retry-after") if response is not None else None
+            if retry_after:
+                try:
+                    delay = max(delay, float(retry_after))
+                except ValueError:
+                    pass
+            await asyncio.sleep(delay)
+        raise RuntimeError("unreachable")
+
+    async def _generate(self, prompt: str, n: int) -> Tuple[List[str], Dict[str, Any]]:
+        payload = {
+            "model": self.model_id,
+            "messages": [{"role": "user", "content": prompt}],
+            "n": n,
+            "temperature": float(self.decoding_params.get("temperature", 0.7)),
+            "max_tokens": int(self.decoding_params.get("max_new_tokens", 128)),
+        }
+        if "top_p" in self.decoding_params:
+            payload["top_p"] = float(self.decoding_params["top_p"])
+        if self._rng is not None:
+            payload["seed"] = self._rng.getrandbits(31)
+        data, latency = await self._post("/chat/completions", payload)
+        texts = [(choice["message"].get("content") or "").strip() for choice in data.get("choices", [])]
+        u = data.get("usage") or {}
+        usage = merge_usage(u.get("prompt_tokens", 0), u.get("completion_tokens", 0))
+        return texts, {"latency": latency, "usage": usage}
+
+    async def _score_one(self, prompt: str, completion: str) -> Tuple[float, Dict[str, int]]:
+        # Echo the prompt+completion through the completions endpoint and sum the logprobs of
+        # the tokens that end past the prompt. Prompts end in a space that the tokenizer attaches to
+        # the next word (" He"), so that token starts inside the prompt but belongs to the completion.
+        payload = {"model": self.model_id, "prompt": prompt + completion, "max_tokens": 0, "echo": True, "logprobs": 0}
+        data, _ = await self._post("/completions", payload)
+        logprobs = data["choices"][0]["logprobs"]
+        total = 0.0
+        n_completion = 0
+        for offset, token, lp in zip(logprobs["text_offset"], logprobs["tokens"], logprobs["token_logprobs"]):
+            if offset + len(token) > len(prompt) and lp is not None:
+                total += float(lp)
+                n_completion += 1
+        n_tokens = len(logprobs["text_offset"])
+        return total, {"prompt_tokens": n_tokens - n_completion, "completion_tokens": n_completion}
+
+    async def _score(self, prompt: str, completions: List[str]) -> Tuple[List[float], Dict[str, Any]]:
+        start = time.perf_counter()
+        results = await asyncio.gather(*(self._score_one(prompt, c) for c in completions))
+        latency = time.perf_counter() - start
+        usage = merge_usage(sum(u["prompt_tokens"] for _, u in results), sum(u["completion_tokens"] for _, u in results))
+        return [s for s, _ in results], {"latency": latency, "usage": usage}
+
+    async def _gather(self, coros: List[Coroutine[Any, Any, Any]]) -> List[Any]:
+        return list(await asyncio.gather(*coros))
+
+    def generate(self, prompt: str, n: int = 1) -> Tuple[List[str], Dict[str, Any]]:
+        return self._run(self._generate(prompt, n))
+
+    def generate_batch(self, prompts: List[str], n: int = 1) -> Tuple[List[List[str]], List[Dict[str, Any]]]:
+        if not prompts:
+            return [], []
+        results = self._run(self._gather([self._generate(p, n) for p in prompts]))
+        return [texts for texts, _ in results], [meta for _, meta in results]
 
     def score(self, prompt: str, completions: List[str]) -> Tuple[List[float], Dict[str, Any]]:
-        self._check()
-        import openai  # type: ignore
-
-        scores = []
-        for completion in completions:
-            response = openai.ChatCompletion.create(
-                model=self.model_id,
-                messages=[{"role": "user", "content": prompt + completion}],
-                n=1,
-                temperature=0.0,
-                max_tokens=1,
-                logprobs=True,
-            )
-            scores.append(float(response["choices"][0]["logprobs"]["token_logprobs"][0]))
-        return scores, {"latency": 0.0, "usage": {}}
+        self._check_scorer()
+        return self._run(self._score(prompt, completions))
+
+    def score_batch(self, requests: List[Tuple[str, List[str]]]) -> Tuple[List[List[float]], List[Dict[str, Any]]]:
+        if not requests:
+            return [], []
+        self._check_scorer()
+        results = self._run(self._gather([self._score(p, c) for p, c in requests]))
+        return [scores for scores, _ in results], [meta for _, meta in results]
+
+    def stats(self) -> Dict[str, Any]:
+        return {"api": {"requests": self.requests, "retries": self.retries}}
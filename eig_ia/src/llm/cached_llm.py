@@ -0,0 +1,111 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..utils.caching import SQLiteCache
+from .llm_base import LLMBase
+
+# Bump whenever scoring or generation semantics change (tokenization, prompt handling, which tokens
+# are scored), so entries written by older code stop matching.
+CACHE_VERSION = 2
+
+
+class CachedLLM(LLMBase):
+    """Content-addressed cache in front of any LLMBase backend.
+
+    Scoring keys cover CACHE_VERSION, the backend config (model id, type, dtype, batch size, decoding
+    params), the weights fingerprint, prompt and completions and are always cached.
+    Generation keys also cover n, the sampling stream seed and the call index within that stream,
+    and are cached only when decoding is greedy unless cache_sampled is set.
+    Hits return the stored outputs and usage with zero latency and "cached": True in the meta.
+    """
+
+    def __init__(
+        self,
+        inner: LLMBase,
+        cache: SQLiteCache,
+        seed: int = 0,
+        cache_sampled: bool = False,
+        backend: Optional[Dict[str, Any]] = None,
+    ):
+        super().__init__(inner.model_id, inner.decoding_params)
+        self.inner = inner
+        self.backend = backend or {}
+        self.weights = inner.fingerprint()
+        self.cache = cache
+        self.seed = int(seed)
+        self.cache_sampled = bool(cache_sampled)
+        self._calls = 0
+
+    def reseed(self, seed: int) -> None:
+        self.seed = int(seed)
+        self._calls = 0
+        self.inner.reseed(seed)
+
+    def _key(self, kind: str, prompt: str, **extra: Any) -> Dict[str, Any]:
+        return {
+            "kind": kind,
+            "version": CACHE_VERSION,
+            "model_id": self.model_id,
+            "decoding": self.decoding_params,
+            "backend": self.backend,
+            "weights": self.weights,
+            "prompt": prompt,
+            **extra,
+        }
+
+    def _cache_generate(self) -> bool:
+        if self.cache_sampled:
+            return True
+        params = self.decoding_params
+        return not bool(params.get("do_sample", True)) or float(params.get("temperature", 0.7)) == 0.0
+
+    @staticmethod
+    def _hit(meta: Dict[str, Any]) -> Dict[str, Any]:
+        return {**meta, "latency": 0.0, "cached": True}
+
+    def generate(self, prompt: str, n: int = 1) -> Tuple[List[str], Dict[str, Any]]:
+        if not self._cache_generate():
+            return self.inner.generate(prompt, n=n)
+        outputs, metas = self.generate_batch([prompt], n=n)
+        return outputs[0], metas[0]
+
+    def generate_batch(self, prompts: List[str], n: int = 1) -> Tuple[List[List[str]], List[Dict[str, Any]]]:
+        if not self._cache_generate():
+            return self.inner.generate_batch(prompts, n=n)
+        call = self._calls
+        self._calls += 1
+        keys = [self._key("generate", p, n=n, seed=self.seed, call=call) for p in prompts]
+        results: List[Any] = [self.cache.get(k) for k in keys]
+        missing = [i for i, r in enumerate(results) if r is None]
+        if missing:
+            outputs, metas = self.inner.generate_batch([prompts[i] for i in missing], n=n)
+            for i, out, meta in zip(missing, outputs, metas):
+                self.cache.put(keys[i], {"outputs": out, "meta": meta})
+                results[i] = {"outputs": out, "meta": meta, "fresh": True}
+        return (
+            [r["outputs"] for r in results],
+            [r["meta"] if r.get("fresh") else self._hit(r["meta"]) for r in results],
+        )
+
+    def score(self, prompt: str, completions: List[str]) -> Tuple[List[float], Dict[str, Any]]:
+        scores, metas = self.score_batch([(prompt, completions)])
+        return scores[0], metas[0]
+
+    def score_batch(self, requests: List[Tuple[str, List[str]]]) -> Tuple[List[List[float]], List[Dict[str, Any]]]:
+        keys = [self._key("score", p, completions=c) for p, c in requests]
+        results: List[Any] = [self.cache.get(k) for k in keys]
+        missing = [i for i, r in enumerate(results) if r is None]
+        if missing:
+            scores, metas = self.inner.score_batch([requests[i] for i in missing])
+            for i, sc, meta in zip(missing, scores, metas):
+                self.cache.put(keys[i], {"scores": sc, "meta": meta})
+                results[i] = {"scores": sc, "meta": meta, "fresh": True}
+        return (
+            [r["scores"] for r in results],
+            [r["meta"] if r.get("fresh") else self._hit(r["meta"]) for r in results],
+        )
+
+    def fingerprint(self) -> str:
+        return self.weights
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.inner.stats(), "llm_cache": self.cache.stats()}
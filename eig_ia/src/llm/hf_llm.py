@@ -1,44 +1,58 @@
+import os
+import random
 import time
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
 import torch
-from transformers import AutoModelForCausalLM, AutoTokenizer
 
+from ..utils.caching import path_fingerprint
+from .kv_cache import KV, PrefixCache, expand, from_legacy, seq_length, to_legacy
 from .llm_base import LLMBase
+from .model_pool import get_model
 from .tokenizer_utils import count_tokens, merge_usage
 
 
 class HFLLM(LLMBase):
-    def __init__(self, model_id: str, decoding_params: Dict[str, Any]):
+    def __init__(
+        self,
+        model_id: str,
+        decoding_params: Dict[str, Any],
+        score_batch_size: int = 16,
+        prefix_cache_mb: float = 0.0,
+        dtype: str = "float32",
+    ):
         super().__init__(model_id, decoding_params)
-        self.tokenizer = AutoTokenizer.from_pretrained(model_id)
-        if self.tokenizer.pad_token is None:
-            self.tokenizer.pad_token = self.tokenizer.eos_token
-        self.model = AutoModelForCausalLM.from_pretrained(model_id)
-        self.model.eval()
-        if torch.cuda.is_available():
-            self.model.to("cuda")
+        self.score_batch_size = max(1, int(score_batch_size))
+        self.prefix_cache = PrefixCache(int(prefix_cache_mb * 1024 * 1024)) if prefix_cache_mb > 0 else None
+        self.tokenizer, self.model = get_model(model_id, dtype)
+        self._rng: Optional[random.Random] = None
 
-    def generate(self, prompt: str, n: int = 1) -> Tuple[List[str], Dict[str, Any]]:
+    def reseed(self, seed: int) -> None:
+        self._rng = random.Random(seed)
+
+    def _seed_sampling(self) -> None:
+        # Seed each generate call from this handle's own stream so samples do not depend on
+        # how much global torch randomness other examples, roles or model loads consumed.
+        if self._rng is not None:
+            torch.manual_seed(self._rng.getrandbits(63))
+
+    def _generation_kwargs(self) -> Dict[str, Any]:
         params = dict(self.decoding_params)
-        max_new_tokens = int(params.pop("max_new_tokens", 64))
-        temperature = float(params.pop("temperature", 0.7))
-        top_p = float(params.pop("top_p", 0.95))
-        do_sample = bool(params.pop("do_sample", True))
+        return {
+            "max_new_tokens": int(params.pop("max_new_tokens", 64)),
+            "temperature": float(params.pop("temperature", 0.7)),
+            "top_p": float(params.pop("top_p", 0.95)),
+            "do_sample": bool(params.pop("do_sample", True)),
+            "pad_token_id": self.tokenizer.eos_token_id,
+        }
 
+    def generate(self, prompt: str, n: int = 1) -> Tuple[List[str], Dict[str, Any]]:
         inputs = self.tokenizer(prompt, return_tensors="pt")
         if torch.cuda.is_available():
             inputs = {k: v.to("cuda") for k, v in inputs.items()}
+        self._seed_sampling()
         start = time.perf_counter()
-        outputs = self.model.generate(
-            **inputs,
-            max_new_tokens=max_new_tokens,
-            temperature=temperature,
-            top_p=top_p,
-            do_sample=do_sample,
-            num_return_sequences=n,
-            pad_token_id=self.tokenizer.eos_token_id,
-        )
+        outputs = self.model.generate(**inputs, num_return_sequences=n, **self._generation_kwargs())
         latency = time.perf_counter() - start
         completions = []
         for output in outputs:
@@ -47,18 +61,137 @@ class HFLLM(LLMBase):
         usage = merge_usage(count_tokens(self.tokenizer, prompt), sum(count_tokens(self.tokenizer, c) for c in completions))
         return completions, {"latency": latency, "usage": usage}
 
-    def score(self, prompt: str, completions: List[str]) -> Tuple[List[float], Dict[str, Any]]:
-        scores = []
+    def generate_batch(self, prompts: List[str], n: int = 1) -> Tuple[List[List[str]], List[Dict[str, Any]]]:
+        if not prompts:
+            return [], []
+        padding_side = self.tokenizer.padding_side
+        self.tokenizer.padding_side = "left"
+        try:
+            inputs = self.tokenizer(prompts, return_tensors="pt", padding=True)
+        finally:
+            self.tokenizer.padding_side = padding_side
+        if torch.cuda.is_available():
+            inputs = {k: v.to("cuda") for k, v in inputs.items()}
+        self._seed_sampling()
         start = time.perf_counter()
-        for completion in completions:
-            full_text = prompt + completion
-            inputs = self.tokenizer(full_text, return_tensors="pt")
-            if torch.cuda.is_available():
-                inputs = {k: v.to("cuda") for k, v in inputs.items()}
+        outputs = self.model.generate(**inputs, num_return_sequences=n, **self._generation_kwargs())
+        latency = time.perf_counter() - start
+        # Left padding keeps every prompt ending at the same column, so new tokens start there.
+        new_tokens = outputs[:, inputs["input_ids"].shape[1] :]
+        texts = [t.strip() for t in self.tokenizer.batch_decode(new_tokens, skip_special_tokens=True)]
+        grouped = [texts[i * n : (i + 1) * n] for i in range(len(prompts))]
+        metas = []
+        for prompt, completions in zip(prompts, grouped):
+            usage = merge_usage(count_tokens(self.tokenizer, prompt), sum(count_tokens(self.tokenizer, c) for c in completions))
+            metas.append({"latency": latency / len(prompts), "usage": usage})
+        return grouped, metas
+
+    def _encode(self, text: str) -> List[int]:
+        return self.tokenizer(text, add_special_tokens=False)["input_ids"]
+
+    def _split(self, prompt: str, completion: str) -> Tuple[List[int], List[int]]:
+        # Tokenize prompt + completion jointly, as the model would see it, and score every token that
+        # ends past the prompt. Prompts ending in a space then score " He" rather than a lone space
+        # followed by an unspaced "He".
+        if not self.tokenizer.is_fast:
+            return self._encode(prompt), self._encode(completion)
+        enc = self.tokenizer(prompt + completion, add_special_tokens=False, return_offsets_mapping=True)
+        ids = enc["input_ids"]
+        split = next((i for i, (_, end) in enumerate(enc["offset_mapping"]) if end > len(prompt)), len(ids))
+        return ids[:split], ids[split:]
+
+    def _prefix_kv(self, prefix_ids: List[int]) -> KV:
+        matched, cached = self.prefix_cache.lookup(prefix_ids) if self.prefix_cache is not None else (0, ())
+        if matched == len(prefix_ids):
+            return cached
+        input_ids = torch.tensor([prefix_ids[matched:]], dtype=torch.long, device=self.model.device)
+        kwargs: Dict[str, Any] = {}
+        if matched:
+            kwargs["past_key_values"] = from_legacy(cached)
+        with torch.no_grad():
+            outputs = self.model(input_ids=input_ids, use_cache=True, **kwargs)
+        kv = to_legacy(outputs.past_key_values)
+        if self.prefix_cache is not None:
+            self.prefix_cache.insert(prefix_ids, kv)
+        return kv
+
+    def _score_pairs(self, pairs: List[Tuple[List[int], List[int]]], past: KV = ()) -> List[float]:
+        # Each pair is (context_ids, target_ids); returns sum log P(target | past, context).
+        # Sequences are right-padded and scored in chunks of score_batch_size, one forward per chunk,
+        # on top of the shared prefix cache `past` broadcast across the batch.
+        device = self.model.device
+        pad_id = self.tokenizer.pad_token_id
+        past_len = seq_length(past)
+        scores = [0.0] * len(pairs)
+        order = sorted(range(len(pairs)), key=lambda i: len(pairs[i][0]) + len(pairs[i][1]))
+        for start in range(0, len(order), self.score_batch_size):
+            chunk = [i for i in order[start : start + self.score_batch_size] if pairs[i][1]]
+            if not chunk:
+                continue
+            seqs = [pairs[i][0] + pairs[i][1] for i in chunk]
+            width = max(len(s) for s in seqs)
+            input_ids = torch.full((len(seqs), width), pad_id, dtype=torch.long)
+            attention_mask = torch.zeros((len(seqs), past_len + width), dtype=torch.long)
+            attention_mask[:, :past_len] = 1
+            for row, seq in enumerate(seqs):
+                input_ids[row, : len(seq)] = torch.tensor(seq, dtype=torch.long)
+                attention_mask[row, past_len : past_len + len(seq)] = 1
+            kwargs: Dict[str, Any] = {}
+            if past_len:
+                kwargs["past_key_values"] = from_legacy(expand(past, len(seqs)))
             with torch.no_grad():
-                outputs = self.model(**inputs, labels=inputs["input_ids"])
-                loss = outputs.loss
-            scores.append(-float(loss))
+                logits = self.model(input_ids=input_ids.to(device), attention_mask=attention_mask.to(device), **kwargs).logits
+            for row, i in enumerate(chunk):
+                context, target = pairs[i]
+                # Logits at position t predict token t + 1.
+                positions = torch.arange(len(context) - 1, len(context) + len(target) - 1, device=device)
+                log_probs = torch.log_softmax(logits[row, positions].float(), dim=-1)
+                target_ids = torch.tensor(target, dtype=torch.long, device=device)
+                scores[i] = float(log_probs.gather(1, target_ids.unsqueeze(1)).sum())
+        return scores
+
+    def score(self, prompt: str, completions: List[str]) -> Tuple[List[float], Dict[str, Any]]:
+        scores, metas = self.score_batch([(prompt, completions)])
+        return scores[0], metas[0]
+
+    def score_batch(self, requests: List[Tuple[str, List[str]]]) -> Tuple[List[List[float]], List[Dict[str, Any]]]:
+        if not requests:
+            return [], []
+        start = time.perf_counter()
+        fallback = self.tokenizer.bos_token_id if self.tokenizer.bos_token_id is not None else self.tokenizer.eos_token_id
+        split = [[self._split(prompt, c) for c in completions] for prompt, completions in requests]
+        contexts = [context or [fallback] for rows in split for context, _ in rows]
+        targets = [target for rows in split for _, target in rows]
+        # Encode the longest prefix shared by all contexts once; every context keeps at least its last
+        # token in the batch rows so the first completion token is predicted by the batch forward.
+        shared = contexts[0][:-1] if contexts else []
+        for ids in contexts[1:]:
+            n = 0
+            while n < min(len(shared), len(ids) - 1) and shared[n] == ids[n]:
+                n += 1
+            shared = shared[:n]
+        past = self._prefix_kv(shared) if shared and any(targets) else ()
+        offset = seq_length(past)
+        flat = self._score_pairs([(ids[offset:], target) for ids, target in zip(contexts, targets)], past)
         latency = time.perf_counter() - start
-        usage = merge_usage(sum(count_tokens(self.tokenizer, prompt) for _ in completions), sum(count_tokens(self.tokenizer, c) for c in completions))
-        return scores, {"latency": latency, "usage": usage}
+        scores = []
+        metas = []
+        pos = 0
+        for rows in split:
+            n = len(rows)
+            scores.append(flat[pos : pos + n])
+            usage = merge_usage(sum(len(ids) for ids in contexts[pos : pos + n]), sum(len(t) for t in targets[pos : pos + n]))
+            metas.append({"latency": latency / len(requests), "usage": usage})
+            pos += n
+        return scores, metas
+
+    def fingerprint(self) -> str:
+        # Local checkpoints can be rewritten in place; Hub checkpoints are pinned by their commit.
+        if os.path.isdir(self.model_id):
+            return path_fingerprint(self.model_id)
+        return str(getattr(self.model.config, "_commit_hash", None) or "")
+
+    def stats(self) -> Dict[str, Any]:
+        if self.prefix_cache is None:
+            return {}
+        return {"prefix_cache": self.prefix_cache.stats()}
@@ -0,0 +1,130 @@
+from collections import OrderedDict
+from typing import Any, Dict, List, Set, Tuple
+
+import torch
+
+KV = Tuple[Tuple[torch.Tensor, torch.Tensor], ...]
+
+
+def to_legacy(past: Any) -> KV:
+    if isinstance(past, tuple):
+        return tuple((k, v) for k, v in past)
+    if hasattr(past, "layers"):
+        return tuple((layer.keys, layer.values) for layer in past.layers)
+    return tuple((k, v) for k, v in past.to_legacy_cache())
+
+
+def from_legacy(kv: KV) -> Any:
+    from transformers import DynamicCache
+
+    cache = DynamicCache()
+    for layer_idx, (k, v) in enumerate(kv):
+        cache.update(k, v, layer_idx)
+    return cache
+
+
+def expand(kv: KV, batch_size: int) -> KV:
+    return tuple((k.expand(batch_size, *k.shape[1:]), v.expand(batch_size, *v.shape[1:])) for k, v in kv)
+
+
+def seq_length(kv: KV) -> int:
+    return int(kv[0][0].shape[-2]) if kv else 0
+
+
+def crop(kv: KV, length: int) -> KV:
+    return tuple((k[..., :length, :], v[..., :length, :]) for k, v in kv)
+
+
+def nbytes(kv: KV) -> int:
+    return sum(k.numel() * k.element_size() + v.numel() * v.element_size() for k, v in kv)
+
+
+class _Node:
+    __slots__ = ("children", "keys")
+
+    def __init__(self) -> None:
+        self.children: Dict[int, "_Node"] = {}
+        self.keys: Set[Tuple[int, ...]] = set()
+
+
+class PrefixCache:
+    """Radix-style KV cache over token prefixes with byte-bounded LRU eviction.
+
+    Every trie node records the cached sequences that pass through it, so a lookup can
+    reuse the longest cached token prefix of a prompt by cropping any of those entries.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = int(max_bytes)
+        self.root = _Node()
+        self.entries: "OrderedDict[Tuple[int, ...], KV]" = OrderedDict()
+        self.bytes_held = 0
+        self.hits = 0
+        self.misses = 0
+        self.tokens_reused = 0
+        self.tokens_computed = 0
+        self.evictions = 0
+
+    def lookup(self, ids: List[int]) -> Tuple[int, KV]:
+        node = self.root
+        depth = 0
+        for tok in ids:
+            child = node.children.get(tok)
+            if child is None:
+                break
+            node = child
+            depth += 1
+        if depth == 0:
+            self.misses += 1
+            self.tokens_computed += len(ids)
+            return 0, ()
+        key = next(iter(node.keys))
+        self.entries.move_to_end(key)
+        self.hits += 1
+        self.tokens_reused += depth
+        self.tokens_computed += len(ids) - depth
+        return depth, crop(self.entries[key], depth)
+
+    def insert(self, ids: List[int], kv: KV) -> None:
+        key = tuple(ids)
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            return
+        size = nbytes(kv)
+        if not key or size > self.max_bytes:
+            return
+        while self.entries and self.bytes_held + size > self.max_bytes:
+            self._evict()
+        self.entries[key] = kv
+        self.bytes_held += size
+        node = self.root
+        for tok in key:
+            node = node.children.setdefault(tok, _Node())
+            node.keys.add(key)
+
+    def _evict(self) -> None:
+        key, kv = self.entries.popitem(last=False)
+        self.bytes_held -= nbytes(kv)
+        self.evictions += 1
+        node = self.root
+        for tok in key:
+            child = node.children[tok]
+            child.keys.discard(key)
+            if not child.keys:
+                del node.children[tok]
+                break
+            node = child
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "tokens_reused": self.tokens_reused,
+            "tokens_computed": self.tokens_computed,
+            "entries": len(self.entries),
+            "bytes_held": self.bytes_held,
+            "max_bytes": self.max_bytes,
+            "evictions": self.evictions,
+        }
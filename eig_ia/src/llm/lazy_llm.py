@@ -0,0 +1,47 @@
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .llm_base import LLMBase
+
+
+class LazyLLM(LLMBase):
+    """Handle that builds its backend on the first generate/score call."""
+
+    def __init__(self, factory: Callable[[], LLMBase], model_id: str, decoding_params: Dict[str, Any]):
+        super().__init__(model_id, decoding_params)
+        self._factory = factory
+        self._llm: Optional[LLMBase] = None
+        self._seed: Optional[int] = None
+
+    @property
+    def materialized(self) -> bool:
+        return self._llm is not None
+
+    def _get(self) -> LLMBase:
+        if self._llm is None:
+            self._llm = self._factory()
+            if self._seed is not None:
+                self._llm.reseed(self._seed)
+        return self._llm
+
+    def reseed(self, seed: int) -> None:
+        self._seed = seed
+        if self._llm is not None:
+            self._llm.reseed(seed)
+
+    def generate(self, prompt: str, n: int = 1) -> Tuple[List[str], Dict[str, Any]]:
+        return self._get().generate(prompt, n=n)
+
+    def generate_batch(self, prompts: List[str], n: int = 1) -> Tuple[List[List[str]], List[Dict[str, Any]]]:
+        return self._get().generate_batch(prompts, n=n)
+
+    def score(self, prompt: str, completions: List[str]) -> Tuple[List[float], Dict[str, Any]]:
+        return self._get().score(prompt, completions)
+
+    def score_batch(self, requests: List[Tuple[str, List[str]]]) -> Tuple[List[List[float]], List[Dict[str, Any]]]:
+        return self._get().score_batch(requests)
+
+    def stats(self) -> Dict[str, Any]:
+        return self._llm.stats() if self._llm is not None else {}
+
+    def fingerprint(self) -> str:
+        return self._get().fingerprint()
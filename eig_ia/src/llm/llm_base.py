@@ -11,6 +11,34 @@ class LLMBase(ABC):
     def generate(self, prompt: str, n: int = 1) -> Tuple[List[str], Dict[str, Any]]:
         raise NotImplementedError
 
+    def generate_batch(self, prompts: List[str], n: int = 1) -> Tuple[List[List[str]], List[Dict[str, Any]]]:
+        outputs = []
+        metas = []
+        for prompt in prompts:
+            texts, meta = self.generate(prompt, n=n)
+            outputs.append(texts)
+            metas.append(meta)
+        return outputs, metas
+
     @abstractmethod
     def score(self, prompt: str, completions: List[str]) -> Tuple[List[float], Dict[str, Any]]:
         raise NotImplementedError
+
+    def score_batch(self, requests: List[Tuple[str, List[str]]]) -> Tuple[List[List[float]], List[Dict[str, Any]]]:
+        scores = []
+        metas = []
+        for prompt, completions in requests:
+            values, meta = self.score(prompt, completions)
+            scores.append(values)
+            metas.append(meta)
+        return scores, metas
+
+    def reseed(self, seed: int) -> None:
+        """Restart this backend's sampling stream from `seed` (no-op for deterministic backends)."""
+
+    def stats(self) -> Dict[str, Any]:
+        return {}
+
+    def fingerprint(self) -> str:
+        """Identifies the loaded weights beyond model_id ("" when the id alone pins them)."""
+        return ""
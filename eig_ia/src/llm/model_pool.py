@@ -0,0 +1,39 @@
+import threading
+from typing import Any, Dict, List, Tuple
+
+import torch
+import transformers
+from packaging import version
+from transformers import AutoModelForCausalLM, AutoTokenizer
+
+_POOL: Dict[Tuple[str, str], Tuple[Any, Any]] = {}
+_LOCK = threading.Lock()
+# transformers 4.56 renamed from_pretrained's torch_dtype to dtype and warns on the old name.
+_DTYPE_KWARG = "dtype" if version.parse(transformers.__version__) >= version.parse("4.56.0") else "torch_dtype"
+
+
+def get_model(name_or_path: str, dtype: str = "float32") -> Tuple[Any, Any]:
+    """Return the process-wide (tokenizer, model) pair for a checkpoint, loading it on first use.
+
+    Roles and methods that point at the same checkpoint and dtype share one copy of the weights;
+    decoding params stay on each HFLLM wrapper.
+    """
+    key = (name_or_path, dtype)
+    with _LOCK:
+        if key not in _POOL:
+            tokenizer = AutoTokenizer.from_pretrained(name_or_path)
+            if tokenizer.pad_token is None:
+                tokenizer.pad_token = tokenizer.eos_token
+            torch_dtype = "auto" if dtype == "auto" else getattr(torch, dtype)
+            model = AutoModelForCausalLM.from_pretrained(name_or_path, **{_DTYPE_KWARG: torch_dtype})
+            model.eval()
+            if torch.cuda.is_available():
+                model.to("cuda")
+            _POOL[key] = (tokenizer, model)
+        return _POOL[key]
+
+
+def loaded_models() -> List[Dict[str, str]]:
+    with _LOCK:
+        return [{"name_or_path": name, "dtype": dtype} for name, dtype in _POOL]
+
@@ -1,12 +1,12 @@
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
-from ..modules.hypothesis_scorer import score_hypotheses
+from .shared_stages import SharedStages, shared_prior
 
 
-def run_direct(dataset: str, example: Dict[str, Any], llm_scorer) -> Dict[str, Any]:
+def run_direct(dataset: str, example: Dict[str, Any], llm_scorer, shared: Optional[SharedStages] = None) -> Dict[str, Any]:
     observation = example["observation"] if dataset == "art" else example["question"]
     hypotheses = example["hypotheses"] if dataset == "art" else example["rewrites"]
-    probs, meta = score_hypotheses(dataset, observation, hypotheses, llm_scorer)
+    probs, meta = shared_prior(shared, dataset, observation, hypotheses, llm_scorer)
     pred = int(probs.index(max(probs)))
     return {
         "asked": False,
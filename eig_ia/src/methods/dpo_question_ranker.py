@@ -1,6 +1,7 @@
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 from .eig_ia import run_eig_ia
+from .shared_stages import SharedStages
 
 
 def run_dpo_question_ranker(
@@ -16,6 +17,15 @@ def run_dpo_question_ranker(
     gate_enabled: bool,
     tau: float,
     gamma: float,
+    answer_dist: str = "sample",
+    shared: Optional[SharedStages] = None,
+    prune: bool = True,
+    selection: str = "exhaustive",
+    adaptive: Optional[Dict[str, Any]] = None,
+    answer_clustering: Optional[Dict[str, Any]] = None,
+    question_dedup: Optional[Dict[str, Any]] = None,
+    hypothesis_pruning: Optional[Dict[str, Any]] = None,
+    deadline: Optional[Dict[str, Any]] = None,
 ) -> Dict[str, Any]:
     result = run_eig_ia(
         dataset,
@@ -30,6 +40,15 @@ def run_dpo_question_ranker(
         gate_enabled,
         tau,
         gamma,
+        answer_dist,
+        shared,
+        prune,
+        selection,
+        adaptive,
+        answer_clustering,
+        question_dedup,
+        hypothesis_pruning,
+        deadline,
     )
     result["meta"]["dpo_note"] = "DPO ranker not trained; using EIG proxy ranking."
     return result
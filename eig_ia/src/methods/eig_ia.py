@@ -1,11 +1,15 @@
-from typing import Any, Dict, List
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
-from ..eig.eig_estimator import estimate_eig
-from ..eig.gating import should_ask
+from ..eig.eig_estimator import estimate_eig_batch
+from ..eig.gating import eig_upper_bound, gate_decided_by_prior, should_ask
+from ..eig.posterior import prune_by_mass
+from ..modules.answer_clustering import assign_clusters
 from ..modules.answer_simulator import simulate_answer
 from ..modules.hypothesis_scorer import score_hypotheses
 from ..modules.oracle_answerers import oracle_answer
 from ..modules.question_generator import generate_questions
+from ..utils.timers import Deadline
+from .shared_stages import SharedStages, shared_prior, shared_questions
 
 
 def run_eig_ia(
@@ -21,18 +25,99 @@ def run_eig_ia(
     gate_enabled: bool,
     tau: float,
     gamma: float,
+    answer_dist: str = "sample",
+    shared: Optional[SharedStages] = None,
+    prune: bool = True,
+    selection: str = "exhaustive",
+    adaptive: Optional[Dict[str, Any]] = None,
+    answer_clustering: Optional[Dict[str, Any]] = None,
+    question_dedup: Optional[Dict[str, Any]] = None,
+    hypothesis_pruning: Optional[Dict[str, Any]] = None,
+    deadline: Optional[Dict[str, Any]] = None,
 ) -> Dict[str, Any]:
+    clock = Deadline(deadline)
     observation = example["observation"] if dataset == "art" else example["question"]
     hypotheses = example["hypotheses"] if dataset == "art" else example["rewrites"]
-    prior_probs, prior_meta = score_hypotheses(dataset, observation, hypotheses, llm_scorer)
+    prior_probs, prior_meta = shared_prior(shared, dataset, observation, hypotheses, llm_scorer)
+    clock.charge(prior_meta)
 
-    questions, q_meta = generate_questions(dataset, observation, hypotheses, llm_q, k)
-    eig_scores: List[float] = []
-    eig_meta: List[Dict[str, Any]] = []
-    for q in questions:
-        eig_value, meta = estimate_eig(dataset, observation, hypotheses, q, prior_probs, llm_a, llm_scorer, m, estimator)
-        eig_scores.append(eig_value)
-        eig_meta.append(meta)
+    if gate_enabled and prune and gate_decided_by_prior(prior_probs, estimator, tau, gamma):
+        # The prior alone settles the gate: no question can reach EIG > gamma.
+        pred = int(prior_probs.index(max(prior_probs)))
+        return {
+            "asked": False,
+            "question": "",
+            "answer": "",
+            "prior_probs": prior_probs,
+            "posterior_probs": prior_probs,
+            "eig": 0.0,
+            "eig_bound": eig_upper_bound(prior_probs, estimator),
+            "pred": pred,
+            "pruned": True,
+            "meta": {"scorer": prior_meta},
+        }
+
+    # Posterior work only covers the hypotheses holding most of the prior mass, renormalized.
+    # Only many-hypothesis examples (the 5+ rewrites robustness bucket by default) are pruned.
+    pruning = hypothesis_pruning or {}
+    if len(hypotheses) >= int(pruning.get("min_hypotheses", 5)):
+        keep, dropped_mass = prune_by_mass(prior_probs, float(pruning.get("mass", 1.0)), int(pruning.get("top_k", 0)))
+    else:
+        keep, dropped_mass = list(range(len(hypotheses))), 0.0
+    kept_mass = sum(prior_probs[i] for i in keep)
+    pruning_info = {"hypotheses_kept": len(keep), "pruned_prior_mass": dropped_mass, "kept_hypotheses": keep}
+
+    pruned_hypotheses = [hypotheses[i] for i in keep]
+    pruned_prior = [prior_probs[i] / kept_mass for i in keep]
+
+    def estimate(
+        candidates: List[str], adaptive_cfg: Optional[Dict[str, Any]], dedup_cfg: Optional[Dict[str, Any]]
+    ) -> Tuple[List[float], List[Dict[str, Any]]]:
+        return estimate_eig_batch(
+            dataset,
+            observation,
+            pruned_hypotheses,
+            candidates,
+            pruned_prior,
+            llm_a,
+            llm_scorer,
+            m,
+            estimator,
+            answer_dist=answer_dist,
+            selection=selection,
+            adaptive=adaptive_cfg,
+            answer_clustering=answer_clustering,
+            question_dedup=dedup_cfg,
+        )
+
+    if clock.enabled:
+        questions, q_meta, eig_scores, eig_meta = _select_anytime(
+            dataset, observation, hypotheses, llm_q, k, shared, clock, question_dedup, estimate
+        )
+    else:
+        questions, q_meta = shared_questions(shared, dataset, observation, hypotheses, llm_q, k)
+        eig_scores, eig_meta = estimate(questions, adaptive, question_dedup)
+        clock.charge([q_meta, *eig_meta])
+    deadline_info = {
+        "deadline_hit": clock.hit,
+        "work_completed": {"questions_evaluated": len(questions), "tokens": clock.spent_tokens, "seconds": clock.elapsed()},
+    }
+
+    if not questions:
+        # The budget ran out before any candidate was evaluated: answer from the prior.
+        pred = int(prior_probs.index(max(prior_probs)))
+        return {
+            "asked": False,
+            "question": "",
+            "answer": "",
+            "prior_probs": prior_probs,
+            "posterior_probs": prior_probs,
+            "eig": 0.0,
+            "pred": pred,
+            **pruning_info,
+            **deadline_info,
+            "meta": {"question": q_meta, "scorer": prior_meta},
+        }
 
     best_idx = max(range(len(questions)), key=lambda i: eig_scores[i])
     best_q = questions[best_idx]
@@ -48,6 +133,8 @@ def run_eig_ia(
             "posterior_probs": prior_probs,
             "eig": best_eig,
             "pred": pred,
+            **pruning_info,
+            **deadline_info,
             "meta": {"question": q_meta, "eig": eig_meta, "scorer": prior_meta},
         }
 
@@ -58,7 +145,7 @@ def run_eig_ia(
         answers, a_meta = simulate_answer(dataset, best_q, llm_a, 1)
         answer = answers[0]
 
-    posterior_probs, post_meta = score_hypotheses(dataset, observation, hypotheses, llm_scorer, best_q, answer)
+    posterior_probs, post_meta = score_hypotheses(dataset, observation, hypotheses, llm_scorer, best_q, answer, keep)
     pred = int(posterior_probs.index(max(posterior_probs)))
     return {
         "asked": True,
@@ -68,5 +155,62 @@ def run_eig_ia(
         "posterior_probs": posterior_probs,
         "eig": best_eig,
         "pred": pred,
+        **pruning_info,
+        **deadline_info,
         "meta": {"question": q_meta, "eig": eig_meta, "scorer": post_meta, "answer": a_meta},
     }
+
+
+def _select_anytime(
+    dataset: str,
+    observation: str,
+    hypotheses: List[str],
+    llm_q,
+    k: int,
+    shared: Optional[SharedStages],
+    clock: Deadline,
+    question_dedup: Optional[Dict[str, Any]],
+    estimate: Callable[..., Tuple[List[float], List[Dict[str, Any]]]],
+) -> Tuple[List[str], List[Dict[str, Any]], List[float], List[Dict[str, Any]]]:
+    """Generate and evaluate one candidate at a time until k are done or the deadline passes.
+
+    ART template questions cost no model call and are built up front; AmbigQA questions are
+    sampled one per step. Duplicates of an evaluated question are skipped. Returns only the
+    evaluated candidates, so the caller's argmax is the best question found so far. The budget is
+    checked between candidates and never interrupts one, so selection can overrun it by up to one
+    candidate's simulation and scoring.
+    """
+    pending: List[str] = []
+    q_meta: List[Dict[str, Any]] = []
+    if dataset == "art":
+        pending, meta = shared_questions(shared, dataset, observation, hypotheses, llm_q, k)
+        q_meta.append(meta)
+    questions: List[str] = []
+    seen: List[str] = []
+    eig_scores: List[float] = []
+    eig_meta: List[Dict[str, Any]] = []
+    for step in range(k):
+        if clock.expired():
+            break
+        if dataset == "art":
+            question = pending[step]
+        else:
+            generated, meta = generate_questions(dataset, observation, hypotheses, llm_q, 1)
+            clock.charge(meta)
+            q_meta.append(meta)
+            question = generated[0]
+            if clock.expired():
+                break
+        if question_dedup and question_dedup.get("method", "none") != "none":
+            rep = assign_clusters([question], seen, question_dedup)[0]
+            if rep != question or rep in questions:
+                continue
+        # Racing needs several live questions, so each candidate gets the fixed-M estimate.
+        scores, metas = estimate([question], None, None)
+        clock.charge(metas)
+        questions.append(question)
+        eig_scores.extend(scores)
+        eig_meta.extend(metas)
+    # Record an overrun by the last candidate evaluated.
+    clock.expired()
+    return questions, q_meta, eig_scores, eig_meta
@@ -1,18 +1,28 @@
 import random
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 from ..modules.answer_simulator import simulate_answer
 from ..modules.hypothesis_scorer import score_hypotheses
 from ..modules.oracle_answerers import oracle_answer
-from ..modules.question_generator import generate_questions
+from .shared_stages import SharedStages, shared_prior, shared_questions
 
 
-def run_random_question(dataset: str, example: Dict[str, Any], llm_q, llm_a, llm_scorer, mode: str, k: int) -> Dict[str, Any]:
+def run_random_question(
+    dataset: str,
+    example: Dict[str, Any],
+    llm_q,
+    llm_a,
+    llm_scorer,
+    mode: str,
+    k: int,
+    rng: Optional[random.Random] = None,
+    shared: Optional[SharedStages] = None,
+) -> Dict[str, Any]:
     observation = example["observation"] if dataset == "art" else example["question"]
     hypotheses = example["hypotheses"] if dataset == "art" else example["rewrites"]
-    prior_probs, prior_meta = score_hypotheses(dataset, observation, hypotheses, llm_scorer)
-    questions, q_meta = generate_questions(dataset, observation, hypotheses, llm_q, k)
-    question = random.choice(questions)
+    prior_probs, prior_meta = shared_prior(shared, dataset, observation, hypotheses, llm_scorer)
+    questions, q_meta = shared_questions(shared, dataset, observation, hypotheses, llm_q, k)
+    question = (rng or random).choice(questions)
     if mode == "oracle":
         answer = oracle_answer(dataset, question, example)
         a_meta = {"source": "oracle"}
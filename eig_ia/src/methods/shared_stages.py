@@ -0,0 +1,73 @@
+import json
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ..modules.hypothesis_scorer import score_hypotheses
+from ..modules.question_generator import generate_questions
+
+
+class SharedStages:
+    """Per-run memo of deterministic per-example stages shared by every method.
+
+    Entries are content-addressed (dataset, observation, hypotheses, ...); prior entries also carry
+    the scorer's model id and decoding params, so only methods that share a scorer reuse one prior.
+    ART template questions do not depend on the question model and are shared across all methods.
+    """
+
+    def __init__(self, entries: Optional[Dict[Tuple, Any]] = None):
+        self.entries: Dict[Tuple, Any] = {}
+        self.new: Dict[Tuple, Any] = {}
+        # Entry keys by (dataset, observation, hypotheses), so a worker can be sent one example's entries.
+        self.by_example: Dict[Tuple, List[Tuple]] = {}
+        self.update(entries or {})
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Tuple, compute: Callable[[], Tuple[List[Any], Dict[str, Any]]]) -> Tuple[List[Any], Dict[str, Any]]:
+        if key in self.entries:
+            self.hits += 1
+            values, meta = self.entries[key]
+            return list(values), {**meta, "shared": True}
+        self.misses += 1
+        values, meta = compute()
+        self.new[key] = (list(values), dict(meta))
+        self.update({key: self.new[key]})
+        return values, meta
+
+    def drain_new(self) -> Dict[Tuple, Any]:
+        new, self.new = self.new, {}
+        return new
+
+    def update(self, entries: Dict[Tuple, Any]) -> None:
+        for key, value in entries.items():
+            if key not in self.entries:
+                self.by_example.setdefault(key[1:4], []).append(key)
+            self.entries[key] = value
+
+    def example_entries(self, dataset: str, observation: str, hypotheses: List[str]) -> Dict[Tuple, Any]:
+        return {key: self.entries[key] for key in list(self.by_example.get((dataset, observation, tuple(hypotheses)), []))}
+
+    def stats(self) -> Dict[str, Any]:
+        return {"entries": len(self.entries), "hits": self.hits, "misses": self.misses}
+
+
+def _model_identity(llm) -> Tuple[str, str]:
+    return str(llm.model_id), json.dumps(llm.decoding_params, sort_keys=True)
+
+
+def shared_prior(
+    shared: Optional[SharedStages], dataset: str, observation: str, hypotheses: List[str], llm_scorer
+) -> Tuple[List[float], Dict[str, Any]]:
+    compute = lambda: score_hypotheses(dataset, observation, hypotheses, llm_scorer)  # noqa: E731
+    if shared is None:
+        return compute()
+    return shared.get(("prior", dataset, observation, tuple(hypotheses), _model_identity(llm_scorer)), compute)
+
+
+def shared_questions(
+    shared: Optional[SharedStages], dataset: str, observation: str, hypotheses: List[str], llm_q, k: int
+) -> Tuple[List[str], Dict[str, Any]]:
+    compute = lambda: generate_questions(dataset, observation, hypotheses, llm_q, k)  # noqa: E731
+    # Only ART questions are template-based and deterministic; sampled questions stay per method.
+    if shared is None or dataset != "art":
+        return compute()
+    return shared.get(("questions", dataset, observation, tuple(hypotheses), k), compute)
@@ -0,0 +1,60 @@
+from typing import Any, Dict, List, Optional
+
+from ..eval.metrics import f1_score, normalize_text
+
+_ENCODERS: Dict[str, Any] = {}
+
+
+def _encoder(name: str):
+    if name not in _ENCODERS:
+        try:
+            from sentence_transformers import SentenceTransformer  # type: ignore
+        except Exception as exc:
+            raise RuntimeError("sentence-transformers not installed; install it for embedding answer clustering") from exc
+        _ENCODERS[name] = SentenceTransformer(name)
+    return _ENCODERS[name]
+
+
+def _same_cluster(answer: str, rep: str, method: str, threshold: float) -> bool:
+    if normalize_text(answer) == normalize_text(rep):
+        return True
+    return method == "lexical" and f1_score(answer, rep) >= threshold
+
+
+def assign_clusters(answers: List[str], reps: List[str], cfg: Optional[Dict[str, Any]] = None) -> List[str]:
+    """Map each answer to the representative of its cluster, appending new representatives to reps.
+
+    cfg["method"] is "none" (exact text), "normalize" (normalize_text match), "lexical" (also token
+    F1 >= threshold) or "embedding" (also cosine similarity >= threshold under embedding_model).
+    The first answer of a cluster is its representative, so posterior scoring sees real answer text.
+    """
+    cfg = cfg or {}
+    method = cfg.get("method", "none")
+    threshold = float(cfg.get("threshold", 0.8))
+    if method == "embedding":
+        return _assign_by_embedding(answers, reps, cfg.get("embedding_model", "sentence-transformers/all-MiniLM-L6-v2"), threshold)
+    assigned = []
+    for answer in answers:
+        if method == "none":
+            rep = answer
+        else:
+            rep = next((r for r in reps if _same_cluster(answer, r, method, threshold)), answer)
+        if rep not in reps:
+            reps.append(rep)
+        assigned.append(rep)
+    return assigned
+
+
+def _assign_by_embedding(answers: List[str], reps: List[str], model_name: str, threshold: float) -> List[str]:
+    texts = list(dict.fromkeys(reps + answers))
+    vectors = dict(zip(texts, _encoder(model_name).encode(texts, normalize_embeddings=True)))
+    assigned = []
+    for answer in answers:
+        rep = next(
+            (r for r in reps if normalize_text(answer) == normalize_text(r) or float(vectors[answer] @ vectors[r]) >= threshold),
+            answer,
+        )
+        if rep not in reps:
+            reps.append(rep)
+        assigned.append(rep)
+    return assigned
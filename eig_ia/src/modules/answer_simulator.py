@@ -1,11 +1,21 @@
+import math
 from typing import Any, Dict, List, Tuple
 
 from ..llm.llm_base import LLMBase
 
 
-def simulate_answer_art(question: str, llm: LLMBase, n: int) -> Tuple[List[str], Dict[str, Any]]:
-    prompt = f"Answer yes or no.\nQuestion: {question}\nAnswer:"
-    outputs, meta = llm.generate(prompt, n=n)
+ART_ANSWER_VARIANTS = {"yes": [" yes", " Yes"], "no": [" no", " No"]}
+
+
+def _art_prompt(question: str) -> str:
+    return f"Answer yes or no.\nQuestion: {question}\nAnswer:"
+
+
+def _ambig_prompt(question: str) -> str:
+    return f"Question: {question}\nAnswer:"
+
+
+def _parse_art(outputs: List[str]) -> List[str]:
     answers = []
     for out in outputs:
         text = out.strip().lower()
@@ -15,17 +25,53 @@ def simulate_answer_art(question: str, llm: LLMBase, n: int) -> Tuple[List[str],
             answers.append("no")
         else:
             answers.append("yes" if "yes" in text else "no")
-    return answers, {"prompt": prompt, **meta}
+    return answers
+
+
+def _parse_ambig(outputs: List[str]) -> List[str]:
+    return [o.strip() for o in outputs]
+
+
+def simulate_answer_art(question: str, llm: LLMBase, n: int) -> Tuple[List[str], Dict[str, Any]]:
+    prompt = _art_prompt(question)
+    outputs, meta = llm.generate(prompt, n=n)
+    return _parse_art(outputs), {"prompt": prompt, **meta}
 
 
 def simulate_answer_ambig(question: str, llm: LLMBase, n: int) -> Tuple[List[str], Dict[str, Any]]:
-    prompt = f"Question: {question}\nAnswer:"
+    prompt = _ambig_prompt(question)
     outputs, meta = llm.generate(prompt, n=n)
-    answers = [o.strip() for o in outputs]
-    return answers, {"prompt": prompt, **meta}
+    return _parse_ambig(outputs), {"prompt": prompt, **meta}
 
 
 def simulate_answer(dataset: str, question: str, llm: LLMBase, n: int) -> Tuple[List[str], Dict[str, Any]]:
     if dataset == "art":
         return simulate_answer_art(question, llm, n)
     return simulate_answer_ambig(question, llm, n)
+
+
+def simulate_answers(dataset: str, questions: List[str], llm: LLMBase, n: int) -> List[Tuple[List[str], Dict[str, Any]]]:
+    """Simulate n answers for every question with a single batched generate call."""
+    build, parse = (_art_prompt, _parse_art) if dataset == "art" else (_ambig_prompt, _parse_ambig)
+    prompts = [build(q) for q in questions]
+    outputs, metas = llm.generate_batch(prompts, n=n)
+    return [(parse(out), {"prompt": prompt, **meta}) for prompt, out, meta in zip(prompts, outputs, metas)]
+
+
+def answer_distribution_art(questions: List[str], llm: LLMBase) -> List[Tuple[Dict[str, float], Dict[str, Any]]]:
+    """Exact yes/no answer distribution per question from one batched scoring pass.
+
+    Reads the likelihood of each surface variant of "yes" and "no" right after the answer prompt
+    and renormalizes over the two answers, instead of sampling and parsing full generations.
+    """
+    prompts = [_art_prompt(q) for q in questions]
+    variants = [v for vs in ART_ANSWER_VARIANTS.values() for v in vs]
+    scores, metas = llm.score_batch([(prompt, variants) for prompt in prompts])
+    results = []
+    for prompt, logps, meta in zip(prompts, scores, metas):
+        top = max(logps)
+        mass = dict(zip(variants, (math.exp(lp - top) for lp in logps)))
+        totals = {a: sum(mass[v] for v in vs) for a, vs in ART_ANSWER_VARIANTS.items()}
+        denom = sum(totals.values())
+        results.append(({a: t / denom for a, t in totals.items()}, {"prompt": prompt, **meta}))
+    return results
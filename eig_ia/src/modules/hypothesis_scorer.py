@@ -1,5 +1,6 @@
-import math
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
 
 from ..data.prompt_templates import (
     AMBIGQA_PRIOR_PROMPT,
@@ -7,37 +8,74 @@ from ..data.prompt_templates import (
     ART_PRIOR_PROMPT,
     ART_SCORE_PROMPT,
 )
+from ..eig.eig_core import log_softmax, softmax
 from ..llm.llm_base import LLMBase
 
 
 def _normalize(scores: List[float]) -> List[float]:
     if not scores:
         return []
-    max_s = max(scores)
-    exp_scores = [math.exp(s - max_s) for s in scores]
-    denom = sum(exp_scores)
-    return [s / denom for s in exp_scores]
+    return softmax(scores).tolist()
 
 
-def score_hypotheses_art(observation: str, hypotheses: List[str], llm: LLMBase, question: str = "", answer: str = "") -> Tuple[List[float], Dict[str, Any]]:
+def _art_prompt(observation: str, question: str = "", answer: str = "") -> str:
     if question:
-        prompt = ART_SCORE_PROMPT.format(observation=observation, question=question, answer=answer)
-    else:
-        prompt = ART_PRIOR_PROMPT.format(observation=observation)
+        return ART_SCORE_PROMPT.format(observation=observation, question=question, answer=answer)
+    return ART_PRIOR_PROMPT.format(observation=observation)
+
+
+def _ambig_prompt(question: str, clarifying_question: str = "", answer: str = "") -> str:
+    if clarifying_question:
+        return AMBIGQA_SCORE_PROMPT.format(question=question, clarifying_question=clarifying_question, answer=answer)
+    return AMBIGQA_PRIOR_PROMPT.format(question=question)
+
+
+def score_hypotheses_art(observation: str, hypotheses: List[str], llm: LLMBase, question: str = "", answer: str = "") -> Tuple[List[float], Dict[str, Any]]:
+    prompt = _art_prompt(observation, question, answer)
     scores, meta = llm.score(prompt, hypotheses)
     return _normalize(scores), {"prompt": prompt, **meta}
 
 
 def score_hypotheses_ambig(question: str, rewrites: List[str], llm: LLMBase, clarifying_question: str = "", answer: str = "") -> Tuple[List[float], Dict[str, Any]]:
-    if clarifying_question:
-        prompt = AMBIGQA_SCORE_PROMPT.format(question=question, clarifying_question=clarifying_question, answer=answer)
-    else:
-        prompt = AMBIGQA_PRIOR_PROMPT.format(question=question)
+    prompt = _ambig_prompt(question, clarifying_question, answer)
     scores, meta = llm.score(prompt, rewrites)
     return _normalize(scores), {"prompt": prompt, **meta}
 
 
-def score_hypotheses(dataset: str, observation: str, hypotheses: List[str], llm: LLMBase, question: str = "", answer: str = "") -> Tuple[List[float], Dict[str, Any]]:
+def score_hypotheses(
+    dataset: str,
+    observation: str,
+    hypotheses: List[str],
+    llm: LLMBase,
+    question: str = "",
+    answer: str = "",
+    keep: Optional[List[int]] = None,
+) -> Tuple[List[float], Dict[str, Any]]:
+    """Normalized hypothesis probabilities; with keep, only those indices are scored and the rest get 0."""
+    if keep is not None and len(keep) < len(hypotheses):
+        kept_probs, meta = score_hypotheses(dataset, observation, [hypotheses[i] for i in keep], llm, question, answer)
+        probs = [0.0] * len(hypotheses)
+        for i, p in zip(keep, kept_probs):
+            probs[i] = p
+        return probs, {**meta, "hypotheses_kept": len(keep)}
     if dataset == "art":
         return score_hypotheses_art(observation, hypotheses, llm, question, answer)
     return score_hypotheses_ambig(observation, hypotheses, llm, question, answer)
+
+
+def log_posteriors_batch(
+    dataset: str,
+    observation: str,
+    hypotheses: List[str],
+    llm: LLMBase,
+    qa_pairs: List[Tuple[str, str]],
+) -> Tuple[np.ndarray, List[Dict[str, Any]]]:
+    """Score the hypotheses under every (question, answer) pair in one batched scorer request.
+
+    Returns a (pairs, hypotheses) array of log posteriors and one meta dict per pair.
+    """
+    build = _art_prompt if dataset == "art" else _ambig_prompt
+    prompts = [build(observation, q, a) for q, a in qa_pairs]
+    scores, metas = llm.score_batch([(prompt, hypotheses) for prompt in prompts])
+    log_probs = log_softmax(np.asarray(scores, dtype=np.float64).reshape(len(prompts), len(hypotheses)))
+    return log_probs, [{"prompt": prompt, **meta} for prompt, meta in zip(prompts, metas)]
@@ -1,6 +1,9 @@
 import hashlib
 import json
 import os
+import sqlite3
+import threading
+import time
 from typing import Any, Dict, Optional
 
 
@@ -9,6 +12,17 @@ def _hash_key(obj: Dict[str, Any]) -> str:
     return hashlib.sha256(raw).hexdigest()
 
 
+def path_fingerprint(path: str) -> str:
+    """Hash of every file's relative path, size and mtime under a directory, so rewrites change it."""
+    entries = []
+    for root, _, files in os.walk(path):
+        for name in files:
+            full = os.path.join(root, name)
+            st = os.stat(full)
+            entries.append((os.path.relpath(full, path), st.st_size, st.st_mtime_ns))
+    return hashlib.sha256(json.dumps(sorted(entries)).encode("utf-8")).hexdigest()
+
+
 def load_cache(cache_dir: str, key: Dict[str, Any]) -> Optional[Dict[str, Any]]:
     os.makedirs(cache_dir, exist_ok=True)
     path = os.path.join(cache_dir, f"{_hash_key(key)}.json")
@@ -24,3 +38,103 @@ def save_cache(cache_dir: str, key: Dict[str, Any], value: Dict[str, Any]) -> st
     with open(path, "w", encoding="utf-8") as f:
         json.dump(value, f, indent=2, sort_keys=True)
     return path
+
+
+class SQLiteCache:
+    """Single-file key/value store (SQLite in WAL mode) with size-bounded LRU eviction.
+
+    Hits only record their access time in memory; the times are written in one transaction with the
+    next put, before stats, or once touch_batch hits are pending, so reads never commit on their own.
+    """
+
+    def __init__(self, path: str, max_bytes: int = 0, touch_batch: int = 256):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.max_bytes = int(max_bytes)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.touch_batch = int(touch_batch)
+        self._touched: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=60.0, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS cache_accessed ON cache (accessed)")
+        self._conn.commit()
+        self._bytes = self._total_size()
+
+    def _total_size(self) -> int:
+        return int(self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM cache").fetchone()[0])
+
+    def get(self, key: Dict[str, Any]) -> Optional[Any]:
+        digest = _hash_key(key)
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM cache WHERE key = ?", (digest,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._touched[digest] = time.time()
+            if len(self._touched) >= self.touch_batch:
+                self._write_touched()
+                self._conn.commit()
+        return json.loads(row[0])
+
+    def _write_touched(self) -> None:
+        if self._touched:
+            self._conn.executemany("UPDATE cache SET accessed = ? WHERE key = ?", [(t, d) for d, t in self._touched.items()])
+            self._touched.clear()
+
+    def flush(self) -> None:
+        with self._lock:
+            self._write_touched()
+            self._conn.commit()
+
+    def put(self, key: Dict[str, Any], value: Any) -> None:
+        raw = json.dumps(value, sort_keys=True)
+        digest = _hash_key(key)
+        with self._lock:
+            self._write_touched()
+            old = self._conn.execute("SELECT size FROM cache WHERE key = ?", (digest,)).fetchone()
+            self._bytes += len(raw) - (old[0] if old else 0)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, size, accessed) VALUES (?, ?, ?, ?)",
+                (digest, raw, len(raw), time.time()),
+            )
+            if self.max_bytes > 0 and self._bytes > self.max_bytes:
+                self._evict()
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        # Other processes may share the file, so resync the running total before evicting down
+        # to 90% of the budget (amortizes eviction over many puts).
+        total = self._total_size()
+        target = int(self.max_bytes * 0.9)
+        for digest, size in self._conn.execute("SELECT key, size FROM cache ORDER BY accessed").fetchall():
+            if total <= target:
+                break
+            self._conn.execute("DELETE FROM cache WHERE key = ?", (digest,))
+            total -= size
+            self.evictions += 1
+        self._bytes = total
+
+    def stats(self) -> Dict[str, Any]:
+        self.flush()
+        with self._lock:
+            entries, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache").fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "path": self.path,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": entries,
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+            "evictions": self.evictions,
+        }
@@ -15,6 +15,38 @@ def write_jsonl(path: str, rows: Iterable[Dict[str, Any]]) -> None:
             f.write(json.dumps(row, ensure_ascii=True) + "\n")
 
 
+def append_jsonl(path: str, rows: Iterable[Dict[str, Any]]) -> None:
+    """Append rows and force them to disk so a crash loses at most the row being written."""
+    ensure_dir(os.path.dirname(path))
+    with open(path, "a", encoding="utf-8") as f:
+        for row in rows:
+            f.write(json.dumps(row, ensure_ascii=True) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def read_jsonl_checkpoint(path: str) -> List[Dict[str, Any]]:
+    """Read a streamed JSONL file, truncating a partially written trailing line left by a crash."""
+    if not os.path.exists(path):
+        return []
+    rows = []
+    good_offset = 0
+    with open(path, "rb") as f:
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            try:
+                if line.strip():
+                    rows.append(json.loads(line))
+            except ValueError:
+                break
+            good_offset += len(line)
+    if good_offset < os.path.getsize(path):
+        with open(path, "r+b") as f:
+            f.truncate(good_offset)
+    return rows
+
+
 def read_jsonl(path: str) -> List[Dict[str, Any]]:
     with open(path, "r", encoding="utf-8") as f:
         return [json.loads(line) for line in f if line.strip()]
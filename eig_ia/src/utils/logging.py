@@ -1,7 +1,7 @@
 import json
 import os
 import time
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 
 def timestamp() -> str:
@@ -14,8 +14,8 @@ def save_json(path: str, data: Dict[str, Any]) -> None:
         json.dump(data, f, indent=2, sort_keys=True)
 
 
-def get_run_dir(base_dir: str) -> str:
-    override = os.environ.get("EIG_IA_RUN_DIR")
+def get_run_dir(base_dir: str, override: Optional[str] = None) -> str:
+    override = override or os.environ.get("EIG_IA_RUN_DIR")
     if override:
         os.makedirs(override, exist_ok=True)
         return override
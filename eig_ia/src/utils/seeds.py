@@ -1,3 +1,4 @@
+import hashlib
 import os
 import random
 from typing import Optional
@@ -26,3 +27,9 @@ def get_rng(seed: Optional[int] = None) -> random.Random:
     if seed is not None:
         rng.seed(seed)
     return rng
+
+
+def derive_seed(seed: int, *parts: object) -> int:
+    """Stable 63-bit seed for an independent stream, e.g. derive_seed(seed, method, example_id)."""
+    raw = "/".join([str(seed)] + [str(p) for p in parts]).encode("utf-8")
+    return int.from_bytes(hashlib.sha256(raw).digest()[:8], "big") >> 1
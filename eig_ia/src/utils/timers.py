@@ -1,6 +1,6 @@
 import time
 from contextlib import contextmanager
-from typing import Dict, Iterator
+from typing import Any, Dict, Iterator, Optional
 
 
 @contextmanager
@@ -10,3 +10,36 @@ def timed(metrics: Dict[str, float], key: str) -> Iterator[None]:
         yield
     finally:
         metrics[key] = metrics.get(key, 0.0) + (time.perf_counter() - start)
+
+
+class Deadline:
+    """Per-example wall-clock and token budget; 0 (or a missing key) disables that limit."""
+
+    def __init__(self, cfg: Optional[Dict[str, Any]] = None):
+        cfg = cfg or {}
+        self.seconds = float(cfg.get("seconds", 0) or 0)
+        self.tokens = int(cfg.get("tokens", 0) or 0)
+        self.start = time.perf_counter()
+        self.spent_tokens = 0
+        self.hit = False
+
+    @property
+    def enabled(self) -> bool:
+        return self.seconds > 0 or self.tokens > 0
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.start
+
+    def charge(self, meta: Any) -> None:
+        if isinstance(meta, list):
+            for item in meta:
+                self.charge(item)
+        elif isinstance(meta, dict):
+            self.spent_tokens += int(meta.get("usage", {}).get("tokens_total", 0))
+
+    def expired(self) -> bool:
+        if not self.hit:
+            over_time = self.seconds > 0 and self.elapsed() >= self.seconds
+            over_tokens = self.tokens > 0 and self.spent_tokens >= self.tokens
+            self.hit = over_time or over_tokens
+        return self.hit
@@ -0,0 +1,108 @@
+import copy
+import os
+
+import pytest
+
+CORPUS = (
+    "Observation: the man went to the store. Hypothesis: he bought milk. he went home. "
+    "Question: Did he buy milk? Did it happen? Answer: yes no. Ambiguous question: who went to the store? "
+    "Clarifying question: which man? Rewrite: which man went to the store today?"
+)
+EXAMPLES = {
+    "art": [
+        {
+            "id": f"art-{i}",
+            "observation": f"the man went to the store {i}. he came back.",
+            "hypotheses": ["he bought milk.", "he went home."],
+            "label": 1 + i % 2,
+        }
+        for i in range(5)
+    ],
+    "ambigqa": [
+        {
+            "id": f"amb-{i}",
+            "question": f"who went to the store {i}?",
+            "rewrites": ["which man went to the store?", "which woman went to the store?", "who went home?"][: 2 + i % 2],
+            "answer_sets": [["the man"], ["the woman"], ["nobody"]],
+        }
+        for i in range(5)
+    ],
+}
+METHODS = ["direct", "random_question", "eig_ia"]
+
+
+@pytest.fixture(scope="session")
+def tiny_model_dir(tmp_path_factory):
+    """A randomly initialized two-layer GPT-2 with a small byte-level BPE tokenizer, built offline."""
+    import torch
+    from tokenizers import Tokenizer, decoders, models, pre_tokenizers, trainers
+    from transformers import GPT2Config, GPT2LMHeadModel, PreTrainedTokenizerFast
+
+    path = str(tmp_path_factory.mktemp("tiny_gpt2"))
+    tok = Tokenizer(models.BPE())
+    tok.pre_tokenizer = pre_tokenizers.ByteLevel(add_prefix_space=False)
+    tok.decoder = decoders.ByteLevel()
+    trainer = trainers.BpeTrainer(
+        vocab_size=400, special_tokens=["<|endoftext|>"], initial_alphabet=pre_tokenizers.ByteLevel.alphabet()
+    )
+    tok.train_from_iterator([CORPUS] * 50, trainer)
+    tokenizer = PreTrainedTokenizerFast(tokenizer_object=tok, eos_token="<|endoftext|>", bos_token="<|endoftext|>")
+    tokenizer.save_pretrained(path)
+    torch.manual_seed(0)
+    model = GPT2LMHeadModel(GPT2Config(vocab_size=len(tokenizer), n_embd=32, n_layer=2, n_head=2, n_positions=512))
+    model.save_pretrained(path)
+    return path
+
+
+
+@pytest.fixture
+def tiny_cfg(tiny_model_dir):
+    """configs/default.yaml pointed at the tiny model, with the LLM call cache off."""
+    import main
+
+    cfg = main.load_config(os.path.join(os.path.dirname(os.path.dirname(__file__)), "configs", "default.yaml"))
+    for role in cfg["models"].values():
+        role["name_or_path"] = tiny_model_dir
+        role["decoding"]["max_new_tokens"] = 4
+    cfg["cache"]["enabled"] = False
+    cfg["evaluation"]["bootstrap"]["n"] = 10
+    return cfg
+
+
+@pytest.fixture(params=["art", "ambigqa"])
+def run_cfg(request, tiny_cfg, monkeypatch):
+    """tiny_cfg over a few in-memory examples of each dataset, with the gate off so every method asks."""
+    import main
+
+    monkeypatch.setattr(main, "iter_dataset", lambda cfg: iter(copy.deepcopy(EXAMPLES[cfg["dataset"]["name"]])))
+    cfg = copy.deepcopy(tiny_cfg)
+    cfg["dataset"]["name"] = request.param
+    cfg["mode"] = "simulator"
+    cfg["gating"]["enabled"] = False
+    return cfg
+
+
+def run_methods(cfg, run_dir, resume=False):
+    import main
+
+    return main._stream_methods(cfg, [(m, m, cfg) for m in METHODS], str(run_dir), {}, 1, resume, append=False)
+
+
+def stable_rows(rows):
+    """Rows without their wall-clock fields, which differ between any two runs."""
+    stable = []
+    for r in rows:
+        row = {k: v for k, v in r.items() if k not in {"latency_total", "latency_per_module"}}
+        row["work_completed"] = {k: v for k, v in row["work_completed"].items() if k != "seconds"}
+        stable.append(row)
+    return stable
+
+
+@pytest.fixture
+def run_rows():
+    return run_methods
+
+
+@pytest.fixture
+def stable():
+    return stable_rows
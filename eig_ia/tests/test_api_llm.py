@@ -0,0 +1,87 @@
+import threading
+import time
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+from scripts.mock_openai_server import Handler
+from src.llm.api_llm import APILLM
+
+pytest.importorskip("httpx")
+
+
+@pytest.fixture
+def serve():
+    """Start scripts/mock_openai_server.py's handler (optionally subclassed) and return its API base."""
+    servers = []
+
+    def start(handler=Handler):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def test_score_sums_logprobs_of_tokens_ending_past_the_prompt(serve):
+    llm = APILLM("davinci-002", {}, api_base=serve())
+    # The mock splits on whitespace-led words with logprob -0.1 per character; " yes" starts inside
+    # "Answer: " but ends past it, so it belongs to the completion.
+    scores, meta = llm.score("Answer: ", ["yes", "no"])
+    assert scores == pytest.approx([-0.4, -0.3])
+    assert meta["usage"]["tokens_in"] == 2 and meta["usage"]["tokens_out"] == 2
+    scores, _ = llm.score("Observation: x.\nHypothesis:", [" he went home."])
+    assert scores == pytest.approx([-1.4])
+
+
+def test_retries_rate_limited_requests(serve):
+    lock = threading.Lock()
+
+    class Flaky(Handler):
+        failures = 3
+
+        def do_POST(self):  # noqa: N802
+            with lock:
+                fail, Flaky.failures = Flaky.failures > 0, Flaky.failures - 1
+            if fail:
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                self._send(429, {"error": {"message": "rate limited"}})
+                return
+            super().do_POST()
+
+    llm = APILLM("davinci-002", {}, api_base=serve(Flaky), max_retries=3)
+    scores, _ = llm.score_batch([("Answer: ", ["yes", "no"]), ("Answer: ", ["maybe"])])
+    assert [pytest.approx(s) for s in scores] == [[-0.4, -0.3], [-0.6]]
+    assert llm.stats()["api"] == {"requests": 6, "retries": 3}
+
+
+def test_in_flight_requests_stay_under_max_concurrency(serve):
+    lock = threading.Lock()
+    counts = {"now": 0, "peak": 0}
+
+    class Slow(Handler):
+        def do_POST(self):  # noqa: N802
+            with lock:
+                counts["now"] += 1
+                counts["peak"] = max(counts["peak"], counts["now"])
+            time.sleep(0.05)
+            try:
+                super().do_POST()
+            finally:
+                with lock:
+                    counts["now"] -= 1
+
+    llm = APILLM("davinci-002", {}, max_concurrency=2, api_base=serve(Slow))
+    scores, _ = llm.score_batch([("Answer: ", ["yes", "no", "maybe"])] * 4)
+    assert [pytest.approx(s) for s in scores] == [[-0.4, -0.3, -0.6]] * 4
+    assert counts["peak"] == 2
+
+
+def test_chat_only_scorer_fails_fast():
+    llm = APILLM("gpt-4", {}, api_base="http://127.0.0.1:9/v1")
+    with pytest.raises(ValueError, match="chat-only"):
+        llm.score("Answer: ", ["yes"])
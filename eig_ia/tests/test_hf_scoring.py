@@ -0,0 +1,48 @@
+import pytest
+import torch
+
+from src.llm.hf_llm import HFLLM
+
+REQUESTS = [
+    ("Observation: the man went to the store.\nHypothesis: ", ["he bought milk.", "he went home."]),
+    ("Observation: the man went to the store.\nQuestion: Did he buy milk?\nAnswer: yes\nHypothesis: ", ["he bought milk.", "he went home."]),
+    ("Observation: the man went to the store.\nQuestion: Did it happen?\nAnswer: no\nHypothesis: ", ["he bought milk.", "he went home."]),
+    ("Ambiguous question: who went to the store?\nRewrite:", [" which man went to the store today?", " who went home?"]),
+    ("Answer: ", ["yes", "no", ""]),
+]
+
+
+def _naive_score(llm: HFLLM, prompt: str, completion: str) -> float:
+    # One unbatched, uncached forward over the jointly tokenized text; sum the log-probs of every
+    # token that ends past the prompt (predicted from BOS when the prompt contributes no tokens).
+    tokenizer, model = llm.tokenizer, llm.model
+    enc = tokenizer(prompt + completion, add_special_tokens=False, return_offsets_mapping=True)
+    ids = enc["input_ids"]
+    ends = [end for _, end in enc["offset_mapping"]]
+    if not ends or ends[0] > len(prompt):
+        ids, ends = [tokenizer.bos_token_id] + ids, [0] + ends
+    with torch.no_grad():
+        logits = model(input_ids=torch.tensor([ids], device=model.device)).logits[0]
+    log_probs = torch.log_softmax(logits.float(), dim=-1)
+    return sum(float(log_probs[t - 1, ids[t]]) for t in range(1, len(ids)) if ends[t] > len(prompt))
+
+
+@pytest.mark.parametrize("score_batch_size", [1, 3, 16])
+def test_batched_scoring_matches_naive_forward(tiny_model_dir, score_batch_size):
+    llm = HFLLM(tiny_model_dir, {}, score_batch_size)
+    scores, metas = llm.score_batch(REQUESTS)
+    assert len(scores) == len(metas) == len(REQUESTS)
+    for (prompt, completions), got in zip(REQUESTS, scores):
+        assert got == pytest.approx([_naive_score(llm, prompt, c) for c in completions], abs=1e-4)
+        # A single request encodes its prompt once and shares that KV across the completions.
+        assert llm.score(prompt, completions)[0] == pytest.approx(got, abs=1e-4)
+
+
+@pytest.mark.parametrize("score_batch_size", [3, 16])
+def test_prefix_cached_scoring_matches_naive_forward(tiny_model_dir, score_batch_size):
+    llm = HFLLM(tiny_model_dir, {}, score_batch_size, prefix_cache_mb=16.0)
+    # The second pass runs every prompt on a warm prefix cache.
+    for _ in range(2):
+        for prompt, completions in REQUESTS:
+            assert llm.score(prompt, completions)[0] == pytest.approx([_naive_score(llm, prompt, c) for c in completions], abs=1e-4)
+    assert llm.stats()["prefix_cache"]["tokens_reused"] > 0
@@ -0,0 +1,83 @@
+import random
+
+import torch
+
+from src.llm.kv_cache import PrefixCache, crop, nbytes
+
+LAYERS = 2
+
+
+def _kv(ids):
+    # Position t of every layer holds token t, so a cropped entry shows which prefix it came from.
+    pos = torch.tensor(ids, dtype=torch.float32).view(1, 1, len(ids), 1).expand(1, 2, len(ids), 4)
+    return tuple((pos.clone(), -pos.clone()) for _ in range(LAYERS))
+
+
+def _common_prefix(a, b):
+    n = 0
+    while n < min(len(a), len(b)) and a[n] == b[n]:
+        n += 1
+    return n
+
+
+def _check_invariants(cache: PrefixCache) -> None:
+    assert cache.bytes_held == sum(nbytes(kv) for kv in cache.entries.values())
+    assert cache.bytes_held <= cache.max_bytes
+    # Every trie node lists exactly the cached sequences passing through it, and no empty branch survives.
+    expected = {}
+    for key in cache.entries:
+        for depth in range(1, len(key) + 1):
+            expected.setdefault(key[:depth], set()).add(key)
+    seen = {}
+    stack = [((), cache.root)]
+    while stack:
+        path, node = stack.pop()
+        for tok, child in node.children.items():
+            seen[path + (tok,)] = set(child.keys)
+            stack.append((path + (tok,), child))
+    assert seen == expected
+
+
+def test_prefix_cache_eviction_keeps_trie_and_bytes_consistent():
+    rng = random.Random(0)
+    entry_bytes = nbytes(_kv([0] * 6))
+    cache = PrefixCache(entry_bytes * 4)
+    for _ in range(400):
+        ids = [rng.randint(0, 3) for _ in range(rng.randint(1, 6))]
+        if rng.random() < 0.5:
+            cache.insert(ids, _kv(ids))
+        else:
+            before = list(cache.entries)
+            depth, kv = cache.lookup(ids)
+            # The lookup reuses the longest prefix held by any cached sequence.
+            assert depth == max((_common_prefix(ids, key) for key in before), default=0)
+            if depth:
+                assert torch.equal(kv[0][0][0, 0, :, 0], torch.tensor(ids[:depth], dtype=torch.float32))
+        _check_invariants(cache)
+    assert cache.evictions > 0
+
+
+def test_prefix_cache_evicts_least_recently_used_first():
+    size = nbytes(_kv([0, 1]))
+    cache = PrefixCache(size * 2)
+    cache.insert([1, 2], _kv([1, 2]))
+    cache.insert([3, 4], _kv([3, 4]))
+    # Touching [1, 2] makes [3, 4] the least recently used entry.
+    assert cache.lookup([1, 2, 9])[0] == 2
+    cache.insert([5, 6], _kv([5, 6]))
+    assert list(cache.entries) == [(1, 2), (5, 6)]
+    assert cache.lookup([3, 4])[0] == 0
+    assert cache.evictions == 1
+    _check_invariants(cache)
+
+
+def test_prefix_cache_skips_oversized_and_empty_entries():
+    cache = PrefixCache(nbytes(_kv([0, 1])))
+    cache.insert([1, 2, 3], _kv([1, 2, 3]))
+    cache.insert([], ())
+    assert not cache.entries and cache.bytes_held == 0
+    cache.insert([1, 2], _kv([1, 2]))
+    depth, kv = cache.lookup([1, 7])
+    assert depth == 1
+    assert torch.equal(kv[0][0], crop(_kv([1, 2]), 1)[0][0])
+    _check_invariants(cache)
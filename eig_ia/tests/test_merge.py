@@ -0,0 +1,28 @@
+import copy
+import os
+
+import pytest
+
+import main
+from src.utils.io import read_jsonl
+
+
+def _run_shard(run_cfg, run_rows, run_dir, index, total):
+    shard_cfg = copy.deepcopy(run_cfg)
+    shard_cfg["dataset"]["shard"] = [index, total]
+    run_rows(shard_cfg, run_dir)
+    main.save_json(os.path.join(run_dir, "config.json"), shard_cfg)
+    return str(run_dir)
+
+
+def test_merged_shards_match_a_single_run(run_cfg, run_rows, stable, tmp_path):
+    full = run_rows(run_cfg, tmp_path / "full")
+    shard_dirs = [_run_shard(run_cfg, run_rows, tmp_path / f"shard{i}", i, 2) for i in range(2)]
+    out_dir = main.merge(shard_dirs, str(tmp_path / "merged"))
+    assert stable(read_jsonl(os.path.join(out_dir, "per_example.jsonl"))) == stable(full)
+
+
+def test_merge_rejects_incomplete_shard_sets(run_cfg, run_rows, tmp_path):
+    shard_dir = _run_shard(run_cfg, run_rows, tmp_path / "shard0", 0, 2)
+    with pytest.raises(ValueError, match="Incomplete or inconsistent shard set"):
+        main.merge([shard_dir], str(tmp_path / "merged"))
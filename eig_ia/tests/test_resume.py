@@ -0,0 +1,17 @@
+import os
+
+
+def test_resume_after_crash_reproduces_rows(run_cfg, run_rows, stable, tmp_path):
+    full = run_rows(run_cfg, tmp_path / "full")
+    run_dir = tmp_path / "resumed"
+    path = os.path.join(run_dir, "per_example.jsonl")
+    run_rows(run_cfg, run_dir)
+    # Keep the first rows and a half-written line, as a crash mid-append would leave them.
+    with open(path, "r", encoding="utf-8") as f:
+        lines = f.readlines()
+    with open(path, "w", encoding="utf-8") as f:
+        f.writelines(lines[:7])
+        f.write(lines[7][: len(lines[7]) // 2])
+    resumed = run_rows(run_cfg, run_dir, resume=True)
+    key = lambda r: (r["method"], r["example_idx"])  # noqa: E731
+    assert stable(sorted(resumed, key=key)) == stable(sorted(full, key=key))